@@ -9,7 +9,7 @@ Eight handy Python/UNO macros for LibreOffice Calc:
   4. insert_timestamp
   5. remove_empty_rows
   6. add_totals_row
-  7. export_sheet_as_csv
+  7. export_sheet_as_csv / export_sheet_streamed / export_all_sheets
   8. consolidate_all_sheets
 
 Place this file in:
@@ -19,10 +19,34 @@ or
 then restart Calc and bind each function under My Macros ▸ CalcMacros.
 """
 
-import uno, os, re
+import uno, os, re, csv, gzip, json
+from contextlib import contextmanager
 from datetime import datetime
 from com.sun.star.awt.FontWeight import BOLD
 from com.sun.star.beans import PropertyValue
+from com.sun.star.sheet.CellFlags import FORMULA
+from com.sun.star.table.CellContentType import EMPTY
+
+# Upper bound on cells moved per getDataArray/setDataArray call, so huge selections
+# are transferred in row blocks instead of one giant array.
+CHUNK_CELLS = 50000
+
+# consolidate_all_sheets: target sheet, whether to drop repeated header rows, and the
+# row block size used when copyRange is unavailable
+CONSOLIDATE_SHEET         = "Master"
+CONSOLIDATE_DEDUPE_HEADER = True
+CONSOLIDATE_CHUNK_ROWS    = 20000
+
+# Exports: output directory; for the streamed exports (export_sheet_streamed,
+# export_all_sheets) also "csv" or "jsonl", gzip on/off, the sheets export_all_sheets
+# writes (empty = every sheet) and the write buffer size
+EXPORT_DIR    = os.path.join(os.path.expanduser("~"), "Desktop")
+EXPORT_FORMAT = "csv"
+EXPORT_GZIP   = False
+EXPORT_SHEETS = ()
+EXPORT_BUFFER = 1 << 20
+
+_WHITESPACE_RE = re.compile(r"\s+")
 
 # ─── Helpers ────────────────────────────────────────────────────────────────
 def _uno_service(name):
@@ -41,6 +65,30 @@ def _msgbox(msg, title="Calc Macro"):
         box = toolkit.createMessageBox(rect, "infobox", 1, title, msg)
     box.execute()
 
+@contextmanager
+def _batch_edit(doc, title, pause_calc=True):
+    """Run a macro's edits as one undo step, without repaints or (optionally) autocalc.
+
+    Controllers are locked and an action lock held, so the view is redrawn once at the end
+    instead of after every change. Everything is restored even if the body raises.
+    """
+    undo = doc.UndoManager
+    autocalc = doc.isAutomaticCalculationEnabled()
+    undo.enterUndoContext(title)
+    doc.lockControllers()
+    doc.addActionLock()
+    if pause_calc:
+        doc.enableAutomaticCalculation(False)
+    try:
+        yield
+    finally:
+        if pause_calc and autocalc:
+            doc.enableAutomaticCalculation(True)
+            doc.calculate()          # catch up on the formulas dirtied meanwhile
+        doc.removeActionLock()
+        doc.unlockControllers()
+        undo.leaveUndoContext()
+
 def _col_to_letter(col):
     """Convert zero-based col index to A, B, ..., Z, AA, AB, ..."""
     s = ""
@@ -51,6 +99,254 @@ def _col_to_letter(col):
             break
     return s
 
+def _clip_to_used_area(sheet, addr):
+    """Intersect a range address with the sheet's used area (None if they don't overlap).
+
+    Whole-column selections would otherwise drag a million empty rows through the bridge.
+    """
+    cursor = sheet.createCursor()
+    cursor.gotoEndOfUsedArea(False)
+    used = cursor.getRangeAddress()
+    end_row = min(addr.EndRow, used.EndRow)
+    end_col = min(addr.EndColumn, used.EndColumn)
+    if end_row < addr.StartRow or end_col < addr.StartColumn:
+        return None
+    clipped = uno.createUnoStruct("com.sun.star.table.CellRangeAddress")
+    clipped.Sheet       = addr.Sheet
+    clipped.StartColumn = addr.StartColumn
+    clipped.StartRow    = addr.StartRow
+    clipped.EndColumn   = end_col
+    clipped.EndRow      = end_row
+    return clipped
+
+def _row_chunks(sheet, addr, chunk_cells=CHUNK_CELLS):
+    """Yield (top_row, row_count, cell_range) blocks covering addr, each at most chunk_cells cells."""
+    width = addr.EndColumn - addr.StartColumn + 1
+    step  = max(1, chunk_cells // width)
+    for top in range(addr.StartRow, addr.EndRow + 1, step):
+        bottom = min(top + step - 1, addr.EndRow)
+        yield top, bottom - top + 1, sheet.getCellRangeByPosition(addr.StartColumn, top, addr.EndColumn, bottom)
+
+def _formula_cells(cell_range, left, top):
+    """Return the (row, col) offsets of every formula cell in cell_range, in one query."""
+    cells = set()
+    for a in cell_range.queryContentCells(FORMULA).getRangeAddresses():
+        for r in range(a.StartRow, a.EndRow + 1):
+            for c in range(a.StartColumn, a.EndColumn + 1):
+                cells.add((r - top, c - left))
+    return cells
+
+def _merge_over_blanks(addresses, data, left, top):
+    """Merge range addresses in the same columns that are separated only by empty cells.
+
+    data is the block's getDataArray() starting at (left, top). Rewriting "" over an empty
+    cell changes nothing, so a formula column broken up by blank spacer rows is written
+    back in one call instead of one per run. Returns (left, top, right, bottom) tuples.
+    """
+    merged = []
+    for a in sorted(addresses, key=lambda a: (a.StartColumn, a.EndColumn, a.StartRow)):
+        if merged:
+            c0, r0, c1, r1 = merged[-1]
+            if (c0, c1) == (a.StartColumn, a.EndColumn) and all(
+                    v == "" for row in data[r1 + 1 - top:a.StartRow - top]
+                    for v in row[c0 - left:c1 - left + 1]):
+                merged[-1] = (c0, r0, c1, max(r1, a.EndRow))
+                continue
+        merged.append((a.StartColumn, a.StartRow, a.EndColumn, a.EndRow))
+    return merged
+
+def _put_rows(sheet, left, top, rows, skip=(), columns=None):
+    """Write a block of rows starting at (left, top) with as few setDataArray calls as possible.
+
+    Only the column offsets in columns (default: all) are written, and cells whose
+    (row, col) offset is in skip are left untouched: adjacent columns without such cells
+    are written as one band spanning all rows, the others as vertical runs of cells
+    between them.
+    """
+    height, width = len(rows), len(rows[0])
+    write = set(range(width)) if columns is None else set(columns)
+    skip_cols = {c for _, c in skip}
+    c = 0
+    while c < width:
+        if c not in write:
+            c += 1
+            continue
+        if c in skip_cols:
+            r = 0
+            while r < height:
+                if (r, c) in skip:
+                    r += 1
+                    continue
+                end = r
+                while end < height and (end, c) not in skip:
+                    end += 1
+                sheet.getCellRangeByPosition(left + c, top + r, left + c, top + end - 1
+                                             ).setDataArray(tuple((row[c],) for row in rows[r:end]))
+                r = end
+            c += 1
+            continue
+        end = c
+        while end < width and end in write and end not in skip_cols:
+            end += 1
+        sheet.getCellRangeByPosition(left + c, top, left + end - 1, top + height - 1
+                                     ).setDataArray(tuple(row[c:end] for row in rows))
+        c = end
+
+def _progress_indicator(doc, text, steps):
+    """Start and return the frame's status-bar progress indicator, or None when there is no UI."""
+    try:
+        indicator = doc.getCurrentController().getFrame().createStatusIndicator()
+        indicator.start(text, steps)
+        return indicator
+    except Exception:
+        return None
+
+def _used_area(sheet):
+    """Return the range address from A1 to the end of the used area, or None for an empty sheet."""
+    cursor = sheet.createCursor()
+    cursor.gotoEndOfUsedArea(False)
+    ea = cursor.getRangeAddress()
+    if ea.EndRow == 0 and ea.EndColumn == 0 and sheet.getCellByPosition(0, 0).Type == EMPTY:
+        return None
+    area = uno.createUnoStruct("com.sun.star.table.CellRangeAddress")
+    area.Sheet     = ea.Sheet
+    area.EndColumn = ea.EndColumn
+    area.EndRow    = ea.EndRow
+    return area
+
+def _copy_rows(master, src_sheet, area, dest_row):
+    """Copy area to column A of master at dest_row.
+
+    copyRange runs entirely inside LibreOffice and keeps formulas and formatting; if it is
+    refused (e.g. protected sheets) the values are moved in CONSOLIDATE_CHUNK_ROWS blocks.
+    """
+    dest = uno.createUnoStruct("com.sun.star.table.CellAddress")
+    dest.Sheet  = master.RangeAddress.Sheet
+    dest.Column = 0
+    dest.Row    = dest_row
+    try:
+        master.copyRange(dest, area)
+        return
+    except Exception:
+        pass
+    cols = area.EndColumn - area.StartColumn + 1
+    for top in range(area.StartRow, area.EndRow + 1, CONSOLIDATE_CHUNK_ROWS):
+        bottom = min(top + CONSOLIDATE_CHUNK_ROWS - 1, area.EndRow)
+        data = src_sheet.getCellRangeByPosition(area.StartColumn, top,
+                                                area.EndColumn, bottom).getDataArray()
+        offset = dest_row + top - area.StartRow
+        master.getCellRangeByPosition(0, offset, cols - 1,
+                                      offset + bottom - top).setDataArray(data)
+
+def _consolidate_sheets(doc, target=CONSOLIDATE_SHEET, dedupe_header=CONSOLIDATE_DEDUPE_HEADER):
+    """Stack the used area of every sheet into `target`. Returns (sheets copied, rows written)."""
+    sheets = doc.getSheets()
+    # create or clear the target sheet
+    if sheets.hasByName(target):
+        master = sheets.getByName(target)
+        master.clearContents(1023)
+    else:
+        sheets.insertNewByName(target, 0)
+        master = sheets.getByName(target)
+
+    names = [n for n in sheets.getElementNames() if n != target]
+    max_rows = master.Rows.getCount()
+    indicator = _progress_indicator(doc, f"Consolidating into '{target}'…", len(names))
+    header = None
+    dest_row = copied = 0
+    try:
+        for i, name in enumerate(names):
+            if indicator:
+                indicator.setValue(i)
+            s = sheets.getByName(name)
+            area = _used_area(s)
+            if area is None:
+                continue
+            if dedupe_header:
+                first = s.getCellRangeByPosition(0, 0, area.EndColumn, 0).getDataArray()[0]
+                if header is None:
+                    header = first
+                elif first == header:
+                    if area.EndRow == 0:
+                        continue
+                    area.StartRow = 1
+            rows = area.EndRow - area.StartRow + 1
+            if dest_row + rows > max_rows:
+                raise RuntimeError(f"'{target}' ran out of rows at sheet '{name}'.")
+            _copy_rows(master, s, area, dest_row)
+            dest_row += rows
+            copied += 1
+    finally:
+        if indicator:
+            indicator.end()
+    return copied, dest_row
+
+def _export_value(value):
+    """Whole numbers come out as 3, not 3.0, like Calc's own CSV export."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def _export_sheet(sheet, path, fmt, compress):
+    """Stream a sheet's used area to path as CSV or JSON lines, one row block at a time.
+
+    Only one block of CHUNK_CELLS cells is held in memory. Values are written raw (dates
+    as serial numbers), unlike Calc's CSV filter. JSON lines use the first row as keys.
+    The file is written under a temporary name and renamed when complete.
+    Returns the number of sheet rows exported, the header row included, in both formats.
+    """
+    area = _used_area(sheet)
+    tmp_path = path + ".tmp"
+    if compress:
+        out = gzip.open(tmp_path, "wt", encoding="utf-8", newline="", compresslevel=6)
+    else:
+        out = open(tmp_path, "w", encoding="utf-8", newline="", buffering=EXPORT_BUFFER)
+    rows = 0
+    try:
+        with out:
+            writer = csv.writer(out) if fmt == "csv" else None
+            keys = None
+            for _, _, chunk in (_row_chunks(sheet, area) if area is not None else ()):
+                for row in chunk.getDataArray():
+                    row = [_export_value(v) for v in row]
+                    rows += 1
+                    if writer:
+                        writer.writerow(row)
+                    elif keys is None:
+                        keys = [str(v) if v != "" else _col_to_letter(c) for c, v in enumerate(row)]
+                    else:
+                        out.write(json.dumps(dict(zip(keys, row)), ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return rows
+
+def _export_sheets(doc, sheets, directory=None, fmt=None, compress=None):
+    """Export each sheet to its own file in directory. Returns [(path, rows), ...].
+
+    Settings left as None come from the EXPORT_* constants at call time.
+    """
+    directory = directory or EXPORT_DIR
+    fmt = fmt or EXPORT_FORMAT
+    compress = EXPORT_GZIP if compress is None else compress
+    os.makedirs(directory, exist_ok=True)
+    ext = (".csv" if fmt == "csv" else ".jsonl") + (".gz" if compress else "")
+    indicator = _progress_indicator(doc, "Exporting sheets…", len(sheets))
+    written = []
+    try:
+        for i, sheet in enumerate(sheets):
+            if indicator:
+                indicator.setValue(i)
+            name = re.sub(r'[\\/:*?"<>|]', "_", sheet.getName())
+            path = os.path.join(directory, name + ext)
+            written.append((path, _export_sheet(sheet, path, fmt, compress)))
+    finally:
+        if indicator:
+            indicator.end()
+    return written
+
 # ─── 1. Convert Formulas to Values ──────────────────────────────────────────
 def convert_formulas_to_values():
     doc = XSCRIPTCONTEXT.getDocument()
@@ -58,17 +354,21 @@ def convert_formulas_to_values():
     if not sel.supportsService("com.sun.star.sheet.SheetCellRange"):
         _msgbox("Select a range first.")
         return
-    rows = sel.Rows.getCount()
-    cols = sel.Columns.getCount()
-    addr = sel.RangeAddress
     sheet = sel.Spreadsheet
-    for r in range(addr.StartRow, addr.StartRow+rows):
-        for c in range(addr.StartColumn, addr.StartColumn+cols):
-            cell = sheet.getCellByPosition(c, r)
-            if cell.Formula:
-                val = cell.Value
-                cell.Formula = ""
-                cell.Value = val
+    addr = _clip_to_used_area(sheet, sel.RangeAddress)
+    if addr is not None:
+        with _batch_edit(doc, "Convert Formulas to Values"):
+            for top, _, chunk in _row_chunks(sheet, addr):
+                # Write the computed values back over the formula ranges only (text results
+                # stay text), so constants keep their rich text, hyperlinks and fields.
+                formulas = chunk.queryContentCells(FORMULA).getRangeAddresses()
+                if not formulas:
+                    continue
+                data = chunk.getDataArray()
+                for c0, r0, c1, r1 in _merge_over_blanks(formulas, data, addr.StartColumn, top):
+                    sheet.getCellRangeByPosition(c0, r0, c1, r1).setDataArray(
+                        tuple(row[c0 - addr.StartColumn:c1 - addr.StartColumn + 1]
+                              for row in data[r0 - top:r1 - top + 1]))
     _msgbox("Formulas have been replaced with their values.")
 
 # ─── 2. Highlight Duplicates ────────────────────────────────────────────────
@@ -78,26 +378,38 @@ def highlight_duplicates_in_selection():
     if not sel.supportsService("com.sun.star.sheet.SheetCellRange"):
         _msgbox("Select a range first.")
         return
-    addr = sel.RangeAddress
     sheet = sel.Spreadsheet
+    addr = _clip_to_used_area(sheet, sel.RangeAddress)
+    if addr is None:
+        _msgbox("Duplicate values have been highlighted.")
+        return
 
-    # build frequency map
-    freq = {}
-    for r in range(addr.StartRow, addr.EndRow+1):
-        for c in range(addr.StartColumn, addr.EndColumn+1):
-            cell = sheet.getCellByPosition(c, r)
-            key = cell.String if cell.Type == 1 else str(cell.Value)
-            if key != "":
-                freq[key] = freq.get(key, 0) + 1
-
-    # highlight any with freq > 1
-    HIGHLIGHT = 0xFFFF66  # pale yellow
-    for r in range(addr.StartRow, addr.EndRow+1):
-        for c in range(addr.StartColumn, addr.EndColumn+1):
-            cell = sheet.getCellByPosition(c, r)
-            key = cell.String if cell.Type == 1 else str(cell.Value)
-            if freq.get(key, 0) > 1:
-                cell.CellBackColor = HIGHLIGHT
+    with _batch_edit(doc, "Highlight Duplicates"):
+        # one bulk read: positions of every non-empty value, keyed by the value itself
+        seen = {}
+        for top, _, chunk in _row_chunks(sheet, addr):
+            for r, row in enumerate(chunk.getDataArray(), top):
+                for c, value in enumerate(row, addr.StartColumn):
+                    if value != "":
+                        seen.setdefault(value, []).append((c, r))
+
+        # merge duplicate cells into vertical runs, then paint them all with one property set
+        dupes = sorted(pos for cells in seen.values() if len(cells) > 1 for pos in cells)
+        runs = []
+        for c, r in dupes:
+            if runs and runs[-1].StartColumn == c and runs[-1].EndRow == r - 1:
+                runs[-1].EndRow = r
+                continue
+            run = uno.createUnoStruct("com.sun.star.table.CellRangeAddress")
+            run.Sheet       = addr.Sheet
+            run.StartColumn = run.EndColumn = c
+            run.StartRow    = run.EndRow    = r
+            runs.append(run)
+        if runs:
+            HIGHLIGHT = 0xFFFF66  # pale yellow
+            ranges = doc.createInstance("com.sun.star.sheet.SheetCellRanges")
+            ranges.addRangeAddresses(tuple(runs), True)
+            ranges.CellBackColor = HIGHLIGHT
 
     _msgbox("Duplicate values have been highlighted.")
 
@@ -108,14 +420,29 @@ def strip_whitespace_in_selection():
     if not sel.supportsService("com.sun.star.sheet.SheetCellRange"):
         _msgbox("Select a range first.")
         return
-    addr = sel.RangeAddress
     sheet = sel.Spreadsheet
-    for r in range(addr.StartRow, addr.EndRow+1):
-        for c in range(addr.StartColumn, addr.EndColumn+1):
-            cell = sheet.getCellByPosition(c, r)
-            if cell.Type == 1 and cell.String:
-                cleaned = re.sub(r"\s+", " ", cell.String.strip())
-                cell.String = cleaned
+    addr = _clip_to_used_area(sheet, sel.RangeAddress)
+    if addr is not None:
+        with _batch_edit(doc, "Strip Whitespace"):
+            for top, _, chunk in _row_chunks(sheet, addr):
+                data = chunk.getDataArray()
+                cleaned = [tuple(_WHITESPACE_RE.sub(" ", v.strip()) if isinstance(v, str) else v
+                                 for v in row) for row in data]
+                changed = [r for r in range(len(data)) if cleaned[r] != data[r]]
+                if not changed:
+                    continue
+                first, last = changed[0], changed[-1]
+                columns = {c for r in changed for c, v in enumerate(cleaned[r]) if v != data[r][c]}
+                # Text that didn't change is not rewritten (it may carry rich text or fields);
+                # writing back "" or an unchanged number is harmless and keeps the bands whole.
+                # Formula cells read back as their results; skip them so the formulas survive.
+                skip = {(r - first, c) for r in range(first, last + 1) for c in columns
+                        if isinstance(data[r][c], str) and data[r][c] != ""
+                        and cleaned[r][c] == data[r][c]}
+                skip |= {(r - first, c) for r, c in _formula_cells(chunk, addr.StartColumn, top)
+                         if first <= r <= last and c in columns}
+                _put_rows(sheet, addr.StartColumn, top + first, cleaned[first:last + 1], skip,
+                          columns)
     _msgbox("Whitespace trimmed and collapsed.")
 
 # ─── 4. Insert Timestamp ───────────────────────────────────────────────────
@@ -128,10 +455,11 @@ def insert_timestamp():
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     addr = sel.RangeAddress
     sheet = sel.Spreadsheet
-    for r in range(addr.StartRow, addr.EndRow+1):
-        for c in range(addr.StartColumn, addr.EndColumn+1):
-            cell = sheet.getCellByPosition(c, r)
-            cell.String = now
+    width = addr.EndColumn - addr.StartColumn + 1
+    row = (now,) * width
+    with _batch_edit(doc, "Insert Timestamp"):
+        for _, height, chunk in _row_chunks(sheet, addr):
+            chunk.setDataArray((row,) * height)
     _msgbox("Current timestamp inserted in selection.")
 
 # ─── 5. Remove Empty Rows ──────────────────────────────────────────────────
@@ -141,18 +469,29 @@ def remove_empty_rows():
     if not sel.supportsService("com.sun.star.sheet.SheetCellRange"):
         _msgbox("Select a range first.")
         return
-    addr = sel.RangeAddress
     sheet = sel.Spreadsheet
-    # bottom→top to avoid reindexing issues
-    for r in range(addr.EndRow, addr.StartRow-1, -1):
-        empty = True
-        for c in range(addr.StartColumn, addr.EndColumn+1):
-            cell = sheet.getCellByPosition(c, r)
-            if (cell.Type == 1 and cell.String != "") or (cell.Type != 1 and cell.Value != 0):
-                empty = False
-                break
-        if empty:
-            sheet.Rows.removeByIndex(r, 1)
+    # rows past the used area are blank already; nothing to gain from deleting them
+    addr = _clip_to_used_area(sheet, sel.RangeAddress)
+    if addr is not None:
+        with _batch_edit(doc, "Remove Empty Rows"):
+            empty = []
+            for _, _, chunk in _row_chunks(sheet, addr):
+                empty.extend(all(v == "" for v in row) for row in chunk.getDataArray())
+
+            # contiguous runs of empty rows as (first row, count)
+            runs = []
+            for i, is_empty in enumerate(empty):
+                if not is_empty:
+                    continue
+                if runs and runs[-1][0] + runs[-1][1] == addr.StartRow + i:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([addr.StartRow + i, 1])
+
+            # bottom→top so earlier runs keep their indexes; one call per run
+            rows = sheet.Rows
+            for first, count in reversed(runs):
+                rows.removeByIndex(first, count)
     _msgbox("Empty rows removed from selection.")
 
 # ─── 6. Add Totals Row ─────────────────────────────────────────────────────
@@ -164,15 +503,16 @@ def add_totals_row():
         return
     addr = sel.RangeAddress
     sheet = sel.Spreadsheet
-    total_idx = addr.EndRow + 1
-    # insert a blank row for totals
-    sheet.Rows.insertByIndex(total_idx, 1)
-    for c in range(addr.StartColumn, addr.EndColumn+1):
-        col = _col_to_letter(c)
-        start = addr.StartRow + 1
-        end   = addr.EndRow + 1
-        cell = sheet.getCellByPosition(c, total_idx)
-        cell.FormulaLocal = "=SUM(%s%d:%s%d)" % (col, start, col, end)
+    with _batch_edit(doc, "Add Totals Row"):
+        total_idx = addr.EndRow + 1
+        # insert a blank row for totals
+        sheet.Rows.insertByIndex(total_idx, 1)
+        for c in range(addr.StartColumn, addr.EndColumn+1):
+            col = _col_to_letter(c)
+            start = addr.StartRow + 1
+            end   = addr.EndRow + 1
+            cell = sheet.getCellByPosition(c, total_idx)
+            cell.FormulaLocal = "=SUM(%s%d:%s%d)" % (col, start, col, end)
     _msgbox("Totals row added below the selection.")
 
 # ─── 7. Export Sheet as CSV ────────────────────────────────────────────────
@@ -180,11 +520,10 @@ def export_sheet_as_csv():
     doc = XSCRIPTCONTEXT.getDocument()
     sheet = doc.getCurrentController().getActiveSheet()
     name  = sheet.getName() + ".csv"
-    home  = os.path.expanduser("~")
-    path  = os.path.join(home, "Desktop", name)
+    path  = os.path.join(EXPORT_DIR, name)
     url   = uno.systemPathToFileUrl(path)
 
-    # prepare filter properties
+    # prepare filter properties; Calc's filter writes values as formatted in the sheet
     props = []
     p = PropertyValue()
     p.Name  = "FilterName"
@@ -194,34 +533,34 @@ def export_sheet_as_csv():
     doc.storeToURL(url, tuple(props))
     _msgbox(f"Sheet exported to CSV:\n{path}")
 
+def export_sheet_streamed():
+    doc = XSCRIPTCONTEXT.getDocument()
+    sheet = doc.getCurrentController().getActiveSheet()
+    # recalculation stays on so the export never sees stale formula results
+    with _batch_edit(doc, "Export Sheet", pause_calc=False):
+        [(path, rows)] = _export_sheets(doc, [sheet])
+    _msgbox(f"Sheet exported ({rows} rows):\n{path}")
+
+def export_all_sheets():
+    doc = XSCRIPTCONTEXT.getDocument()
+    sheets = doc.getSheets()
+    names = [n for n in sheets.getElementNames() if not EXPORT_SHEETS or n in EXPORT_SHEETS]
+    with _batch_edit(doc, "Export All Sheets", pause_calc=False):
+        written = _export_sheets(doc, [sheets.getByName(n) for n in names])
+    _msgbox(f"{len(written)} sheet(s) exported to {EXPORT_DIR}:\n" +
+            "\n".join(f"{os.path.basename(p)} ({rows} rows)" for p, rows in written))
+
 # ─── 8. Consolidate All Sheets ─────────────────────────────────────────────
 def consolidate_all_sheets():
-    doc    = XSCRIPTCONTEXT.getDocument()
-    sheets = doc.getSheets()
-    # create or clear "Master"
-    if sheets.hasByName("Master"):
-        master = sheets.getByName("Master")
-        master.clearContents(1023)
-    else:
-        master = sheets.insertNewByName("Master", 0)
+    doc = XSCRIPTCONTEXT.getDocument()
+    try:
+        with _batch_edit(doc, "Consolidate All Sheets"):
+            copied, rows = _consolidate_sheets(doc)
+    except RuntimeError as e:
+        _msgbox(f"Consolidation stopped: {e}")
+        return
+    _msgbox(f"{copied} sheets ({rows} rows) consolidated into '{CONSOLIDATE_SHEET}'.")
 
-    dest_row = 0
-    for name in sheets.getElementNames():
-        if name == master.getName(): 
-            continue
-        s = sheets.getByName(name)
-        cursor = s.createCursor()
-        cursor.gotoEndOfUsedArea(True)
-        ea = cursor.getRangeAddress()
-        rows = ea.EndRow + 1
-        cols = ea.EndColumn + 1
-        src = s.getCellRangeByPosition(0, 0, cols-1, rows-1).getDataArray()
-        dest = master.getCellRangeByPosition(0, dest_row, cols-1, dest_row+rows-1)
-        dest.setDataArray(src)
-        dest_row += rows
-
-    _msgbox(f"All sheets consolidated into '{master.getName()}'.")
-    
 
 # LibreOffice entry points
 g_exportedScripts = (
@@ -232,5 +571,7 @@ g_exportedScripts = (
     remove_empty_rows,
     add_totals_row,
     export_sheet_as_csv,
+    export_sheet_streamed,
+    export_all_sheets,
     consolidate_all_sheets,
 )
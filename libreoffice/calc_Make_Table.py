@@ -9,6 +9,7 @@
 #   • freezes the header row
 
 import uno
+from contextlib import contextmanager
 from com.sun.star.awt.FontWeight import BOLD
 
 # -------------------------------------------------------------------- helpers
@@ -32,6 +33,30 @@ def _msgbox(msg: str, title: str = "Quick Table"):
         box = toolkit.createMessageBox(rect, "infobox", 1, title, msg)
     box.execute()
 
+@contextmanager
+def _batch_edit(doc, title, pause_calc=True):
+    """Run a macro's edits as one undo step, without repaints or (optionally) autocalc.
+
+    Controllers are locked and an action lock held, so the view is redrawn once at the end
+    instead of after every change. Everything is restored even if the body raises.
+    """
+    undo = doc.UndoManager
+    autocalc = doc.isAutomaticCalculationEnabled()
+    undo.enterUndoContext(title)
+    doc.lockControllers()
+    doc.addActionLock()
+    if pause_calc:
+        doc.enableAutomaticCalculation(False)
+    try:
+        yield
+    finally:
+        if pause_calc and autocalc:
+            doc.enableAutomaticCalculation(True)
+            doc.calculate()          # catch up on the formulas dirtied meanwhile
+        doc.removeActionLock()
+        doc.unlockControllers()
+        undo.leaveUndoContext()
+
 def _hex(color_hex):
     """Convert HTML-style 0xRRGGBB (or '#RRGGBB') to LibreOffice int."""
     if isinstance(color_hex, str):
@@ -53,10 +78,21 @@ def _apply_manual_banding(sel, addr, header_rgb="#D6E5F3", band_rgb="#EAF1FB"):
     header.CharWeight = BOLD
     header.CellBackColor = _hex(header_rgb)
 
-    # Banded rows  (every second data row starting with first data row)
+    # Banded rows  (every second data row starting with first data row),
+    # collected into one SheetCellRanges so they are painted with a single call
+    bands = []
     for r in range(start_row + 1, end_row + 1, 2):
-        band = sheet.getCellRangeByPosition(start_col, r, end_col, r)
-        band.CellBackColor = _hex(band_rgb)
+        band = uno.createUnoStruct("com.sun.star.table.CellRangeAddress")
+        band.Sheet       = addr.Sheet
+        band.StartColumn = start_col
+        band.EndColumn   = end_col
+        band.StartRow    = band.EndRow = r
+        bands.append(band)
+    if bands:
+        ranges = XSCRIPTCONTEXT.getDocument().createInstance(
+            "com.sun.star.sheet.SheetCellRanges")
+        ranges.addRangeAddresses(tuple(bands), False)
+        ranges.CellBackColor = _hex(band_rgb)
 
 # -------------------------------------------------------------------- main macro
 def make_table_from_selection():
@@ -73,34 +109,35 @@ def make_table_from_selection():
 
     addr = sel.RangeAddress  # struct copy
 
-    # 2. Database range ------------------------------------------------------
-    db_ranges = doc.DatabaseRanges
-    name      = "QuickTable"
-    if db_ranges.hasByName(name):
-        db_range = db_ranges.getByName(name)
-        db_range.setDataArea(addr)          # reuse for new selection
-    else:
-        db_ranges.addNewByName(name, addr)
-        db_range = db_ranges.getByName(name)
-
-    # 3. AutoFilter ----------------------------------------------------------
-    db_range.AutoFilter = True
-
-    # 4. Try built-in AutoFormat --------------------------------------------
-    auto_fmt = _uno_service("com.sun.star.sheet.TableAutoFormat")
-    if auto_fmt:
-        try:
-            auto_fmt.applyAutoFormat(
-                sel,
-                13,                       # “Blue” banded rows
-                True, True, True, True, True, True
-            )
-        except Exception:
-            auto_fmt = None  # fall back if call fails
-
-    # 5. Fallback banding if AutoFormat missing -----------------------------
-    if auto_fmt is None:
-        _apply_manual_banding(sel, addr)
+    with _batch_edit(doc, "Format as Table"):
+        # 2. Database range --------------------------------------------------
+        db_ranges = doc.DatabaseRanges
+        name      = "QuickTable"
+        if db_ranges.hasByName(name):
+            db_range = db_ranges.getByName(name)
+            db_range.setDataArea(addr)          # reuse for new selection
+        else:
+            db_ranges.addNewByName(name, addr)
+            db_range = db_ranges.getByName(name)
+
+        # 3. AutoFilter ------------------------------------------------------
+        db_range.AutoFilter = True
+
+        # 4. Try built-in AutoFormat ----------------------------------------
+        auto_fmt = _uno_service("com.sun.star.sheet.TableAutoFormat")
+        if auto_fmt:
+            try:
+                auto_fmt.applyAutoFormat(
+                    sel,
+                    13,                       # “Blue” banded rows
+                    True, True, True, True, True, True
+                )
+            except Exception:
+                auto_fmt = None  # fall back if call fails
+
+        # 5. Fallback banding if AutoFormat missing -------------------------
+        if auto_fmt is None:
+            _apply_manual_banding(sel, addr)
 
     # -- 6. Freeze ONLY the top row, never the left column ----------------------
     controller = doc.getCurrentController()
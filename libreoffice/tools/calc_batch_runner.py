@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Run the Calc macros over a directory of workbooks, unattended.
+
+Starts a pool of headless soffice instances (one profile and UNO pipe each), keeps a
+connection open to every instance for the whole run and feeds it .ods/.xlsx files from a
+shared queue, so hundreds of reports are processed in parallel on all cores.
+
+Needs LibreOffice's Python UNO bridge: run it with LibreOffice's bundled python or a
+system python that has the 'uno' module (python3-uno on Debian/Ubuntu).
+
+    tools/calc_batch_runner.py remove_empty_rows ~/Reports --all-sheets --output ~/Reports/clean
+"""
+
+import os
+import ast
+import sys
+import time
+import queue
+import uuid
+import shutil
+import tempfile
+import argparse
+import threading
+import subprocess
+import importlib.util
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    from com.sun.star.connection import NoConnectException
+    from com.sun.star.lang import DisposedException
+except ImportError:
+    uno = None
+
+# The macro files sit one level up; this tool lives in tools/ so install.sh doesn't
+# copy it into LibreOffice's Scripts directory along with them.
+MACRO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Macro files whose g_exportedScripts can be run by name.
+MACRO_FILES = [
+    os.path.join(MACRO_DIR, "cal_Calculation_Functions.py"),
+    os.path.join(MACRO_DIR, "calc_Make_Table.py"),
+]
+
+# Macros that act on the whole document rather than the selection; --all-sheets
+# doesn't repeat them per sheet.
+DOCUMENT_MACROS = {"export_sheet_as_csv", "export_sheet_streamed", "export_all_sheets",
+                   "consolidate_all_sheets"}
+
+# Macros that write files to EXPORT_DIR; each workbook gets its own export directory.
+EXPORT_MACROS = {"export_sheet_as_csv", "export_sheet_streamed", "export_all_sheets"}
+
+WORKBOOK_EXTENSIONS = {".ods": "calc8", ".xlsx": "Calc MS Excel 2007 XML"}
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+
+# How long to wait for a freshly started soffice to accept connections.
+STARTUP_TIMEOUT = 60.0
+
+_DONE = object()
+
+
+def find_soffice() -> Optional[str]:
+    """Return the soffice binary on PATH, or the macOS app bundle's copy."""
+    found = shutil.which("soffice") or shutil.which("libreoffice")
+    if found:
+        return found
+    mac = "/Applications/LibreOffice.app/Contents/MacOS/soffice"
+    return mac if os.path.exists(mac) else None
+
+
+def exported_macros() -> Dict[str, str]:
+    """Map every exported macro name to the file defining it, without importing the files."""
+    macros = {}
+    for path in MACRO_FILES:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in tree.body:
+            if (isinstance(node, ast.Assign)
+                    and any(isinstance(t, ast.Name) and t.id == "g_exportedScripts" for t in node.targets)
+                    and isinstance(node.value, ast.Tuple)):
+                for element in node.value.elts:
+                    if isinstance(element, ast.Name):
+                        macros[element.id] = path
+    return macros
+
+
+def _props(**values) -> Tuple:
+    """Build a tuple of PropertyValue structs from keyword arguments."""
+    props = []
+    for name, value in values.items():
+        p = PropertyValue()
+        p.Name = name
+        p.Value = value
+        props.append(p)
+    return tuple(props)
+
+
+class ScriptContext:
+    """Stand-in for the XSCRIPTCONTEXT LibreOffice gives macros run from the Macros menu."""
+
+    def __init__(self, ctx, desktop):
+        self.ctx = ctx
+        self.desktop = desktop
+        self.document = None
+        self.messages: List[str] = []
+
+    def getComponentContext(self):
+        return self.ctx
+
+    def getDesktop(self):
+        return self.desktop
+
+    def getDocument(self):
+        return self.document
+
+    def message(self, msg, title=None):
+        """Replacement for the macros' _msgbox: there is nobody to click OK headless."""
+        self.messages.append(" ".join(str(msg).split()))
+
+
+class OfficeInstance:
+    """One headless soffice process with a private profile and a UNO connection to it.
+
+    The instance listens on a named pipe unique to this run rather than a TCP port, so
+    the runner can never connect to (and later terminate) the user's own soffice.
+    """
+
+    def __init__(self, binary: str):
+        self.binary = binary
+        self.pipe = f"calc-batch-{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self.profile = tempfile.mkdtemp(prefix="calc-batch-")
+        self.process: Optional[subprocess.Popen] = None
+        self.ctx = None
+        self.desktop = None
+
+    def start(self, timeout: float = STARTUP_TIMEOUT):
+        accept = f"pipe,name={self.pipe};urp;StarOffice.ComponentContext"
+        self.process = subprocess.Popen(
+            [self.binary, "--headless", "--invisible", "--nologo", "--norestore",
+             "--nodefault", "--nolockcheck", f"--accept={accept}",
+             f"-env:UserInstallation={uno.systemPathToFileUrl(self.profile)}"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self.ctx = resolver.resolve(f"uno:{accept}")
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError(f"soffice on pipe {self.pipe} did not start")
+                time.sleep(0.25)
+        if not self._is_own_instance():
+            self.stop()
+            raise RuntimeError(f"pipe {self.pipe} is served by another soffice")
+        self.desktop = self.ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", self.ctx)
+
+    def _is_own_instance(self) -> bool:
+        """True if the connected office runs with this instance's private profile."""
+        substitution = self.ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.util.PathSubstitution", self.ctx)
+        user_dir = substitution.getSubstituteVariableValue("$(user)")
+        return any(user_dir.startswith(uno.systemPathToFileUrl(p))
+                   for p in (self.profile, os.path.realpath(self.profile)))
+
+    def stop(self):
+        asked = False
+        if self.desktop is not None:
+            try:
+                self.desktop.terminate()
+                asked = True
+            except Exception:
+                pass  # already gone
+            self.desktop = None
+        self.ctx = None
+        if self.process is not None:
+            if not asked and self.process.poll() is None:
+                # Never connected (or connected elsewhere): stop our own process directly
+                self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile, ignore_errors=True)
+
+
+def _load_macro(path: str, name: str, context: ScriptContext):
+    """Import a private copy of a macro file bound to context and return the named function.
+
+    Each worker gets its own module object because the macros read XSCRIPTCONTEXT from
+    their module globals.
+    """
+    spec = importlib.util.spec_from_file_location(f"calc_macros_{id(context)}", path)
+    module = importlib.util.module_from_spec(spec)
+    module.XSCRIPTCONTEXT = context
+    spec.loader.exec_module(module)
+    module._msgbox = context.message
+    return getattr(module, name)
+
+
+def _select_used_area(doc, sheet):
+    """Make sheet active and select its used area, as a user would before running a macro."""
+    controller = doc.getCurrentController()
+    controller.setActiveSheet(sheet)
+    cursor = sheet.createCursor()
+    cursor.gotoStartOfUsedArea(False)
+    cursor.gotoEndOfUsedArea(True)
+    controller.select(cursor)
+
+
+def process_workbook(office: OfficeInstance, context: ScriptContext, macro, path: str,
+                     all_sheets: bool, output_dir: Optional[str]):
+    """Open one workbook hidden, run the macro on it and save it if the macro changed it.
+
+    Export macros write to a directory of their own per workbook, named after it, in
+    output_dir (or next to the workbook). output_dir is this workbook's own, see
+    _output_dir_for.
+    """
+    if macro.__name__ in EXPORT_MACROS:
+        export_dir = os.path.join(output_dir or os.path.dirname(os.path.abspath(path)),
+                                  os.path.splitext(os.path.basename(path))[0])
+        os.makedirs(export_dir, exist_ok=True)
+        macro.__globals__["EXPORT_DIR"] = export_dir
+    doc = office.desktop.loadComponentFromURL(
+        uno.systemPathToFileUrl(os.path.abspath(path)), "_blank", 0, _props(Hidden=True))
+    if doc is None:
+        raise OSError("LibreOffice could not open the file")
+    context.document = doc
+    try:
+        sheets = doc.getSheets()
+        if all_sheets and macro.__name__ not in DOCUMENT_MACROS:
+            targets = [sheets.getByName(n) for n in sheets.getElementNames()]
+        else:
+            targets = [doc.getCurrentController().getActiveSheet()]
+        for sheet in targets:
+            _select_used_area(doc, sheet)
+            macro()
+
+        if not doc.isModified():
+            pass  # export-only macros leave the workbook as it was
+        elif output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            dest = os.path.join(output_dir, os.path.basename(path))
+            ext = os.path.splitext(path)[1].lower()
+            doc.storeToURL(uno.systemPathToFileUrl(os.path.abspath(dest)),
+                           _props(FilterName=WORKBOOK_EXTENSIONS[ext], Overwrite=True))
+        else:
+            doc.store()
+    finally:
+        context.document = None
+        doc.close(True)
+
+
+def _output_dir_for(path: str, output_dir: Optional[str], root: Optional[str]) -> Optional[str]:
+    """Where a workbook's results go: output_dir mirrors the workbook's place under root,
+    so same-named workbooks from different subdirectories don't overwrite each other."""
+    if not output_dir or not root:
+        return output_dir
+    return os.path.normpath(os.path.join(output_dir, os.path.relpath(os.path.dirname(path), root)))
+
+
+def _worker(office: OfficeInstance, macro_path: str, macro_name: str, files: queue.Queue,
+            results: list, all_sheets: bool, output_dir: Optional[str], root: Optional[str],
+            lock: threading.Lock):
+    """Process files from the queue on one office instance until the queue is drained."""
+    try:
+        try:
+            office.start()
+            context = ScriptContext(office.ctx, office.desktop)
+            macro = _load_macro(macro_path, macro_name, context)
+        except Exception as e:
+            # Leave the remaining files to the other workers.
+            with lock:
+                print(f"Error: {e}", file=sys.stderr)
+            return
+        while True:
+            path = files.get()
+            if path is _DONE:
+                break
+            start = time.perf_counter()
+            error = None
+            for attempt in (1, 2):
+                del context.messages[:]
+                try:
+                    process_workbook(office, context, macro, path, all_sheets,
+                                     _output_dir_for(path, output_dir, root))
+                    error = None
+                    break
+                except DisposedException as e:
+                    # The instance crashed or hung up: start a fresh one and retry once.
+                    error = e
+                    if attempt == 1:
+                        try:
+                            office.restart()
+                            context.ctx, context.desktop = office.ctx, office.desktop
+                        except Exception as restart_error:
+                            error = restart_error
+                            break
+                except Exception as e:
+                    error = e
+                    break
+            elapsed = time.perf_counter() - start
+            with lock:
+                results.append((path, error))
+                if error:
+                    print(f"FAIL  {path}: {error}", file=sys.stderr)
+                else:
+                    note = f"  ({context.messages[-1]})" if context.messages else ""
+                    print(f"ok    {path}  {elapsed:.1f}s{note}")
+    finally:
+        office.close()
+
+
+def run_batch(macro_name: str, files: List[str], workers: int, all_sheets: bool = False,
+              output_dir: Optional[str] = None, soffice: Optional[str] = None,
+              root: Optional[str] = None) -> int:
+    """Apply an exported macro to every file with a pool of headless instances.
+
+    With root, results in output_dir keep each file's path relative to root.
+    Returns the number of files that failed.
+    """
+    macro_path = exported_macros()[macro_name]
+    binary = soffice or find_soffice()
+    if not binary:
+        raise RuntimeError("soffice not found; install LibreOffice or pass --soffice")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    workers = max(1, min(workers, len(files)))
+    pending: queue.Queue = queue.Queue()
+    for path in files:
+        pending.put(path)
+    for _ in range(workers):
+        pending.put(_DONE)
+
+    results: list = []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=_worker, args=(OfficeInstance(binary), macro_path, macro_name,
+                                               pending, results, all_sheets, output_dir, root,
+                                               lock))
+        for _ in range(workers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    failed = sum(1 for _, error in results if error) + (len(files) - len(results))
+    print(f"\n{len(files) - failed}/{len(files)} workbooks processed with {macro_name}.")
+    return failed
+
+
+def collect_workbooks(directory: str, recursive: bool) -> List[str]:
+    """Return the .ods/.xlsx files in directory (skipping LibreOffice lock files), sorted."""
+    found = []
+    for root, dirs, names in os.walk(directory):
+        for name in names:
+            if (os.path.splitext(name)[1].lower() in WORKBOOK_EXTENSIONS
+                    and not name.startswith(".~lock.")):
+                found.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return sorted(found)
+
+
+def main():
+    macros = exported_macros()
+    parser = argparse.ArgumentParser(description="Run a Calc macro over a directory of workbooks "
+                                                 "with a pool of headless LibreOffice instances.")
+    parser.add_argument("macro", nargs="?", choices=sorted(macros), help="Exported macro to run.")
+    parser.add_argument("directory", nargs="?", help="Directory holding .ods/.xlsx files.")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Include subdirectories.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Number of soffice instances (defaults to {DEFAULT_WORKERS}).")
+    parser.add_argument("--all-sheets", action="store_true",
+                        help="Run selection macros on the used area of every sheet, not just "
+                             "the active one.")
+    parser.add_argument("--output", metavar="DIR",
+                        help="Write results to DIR instead of saving the workbooks in place; "
+                             "subdirectories are mirrored under DIR.")
+    parser.add_argument("--soffice", help="Path to the soffice binary.")
+    parser.add_argument("--list", action="store_true", help="List the available macros and exit.")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, path in sorted(macros.items()):
+            print(f"{name:36} {os.path.basename(path)}")
+        return
+    if not args.macro or not args.directory:
+        parser.error("a macro and a directory are required")
+    if uno is None:
+        print("Error: the 'uno' module is missing; run this with LibreOffice's python "
+              "or install python3-uno.", file=sys.stderr)
+        sys.exit(1)
+
+    files = collect_workbooks(args.directory, args.recursive)
+    if not files:
+        print(f"No .ods or .xlsx files in {args.directory}")
+        return
+    try:
+        failed = run_batch(args.macro, files, args.workers, args.all_sheets, args.output,
+                           args.soffice, root=args.directory)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
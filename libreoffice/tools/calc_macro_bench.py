@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Calc macros, without LibreOffice.
+
+Runs every exported macro against synthetic sheets of increasing size on the in-process
+UNO stand-in (fake_uno.py) and reports how many UNO calls each one makes and how long it
+takes. Call counts are what matter: in a live session each call is a bridge round trip,
+so a macro whose count grows with the number of cells is the one that takes minutes.
+
+    calc_macro_bench.py --sizes 1000,10000 --macros remove_empty_rows
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from typing import Dict, List
+
+import fake_uno
+from calc_batch_runner import exported_macros, _load_macro
+
+# Columns in the synthetic sheet: padded text with duplicates, numbers, formulas, and
+# free text with runs of spaces. Every tenth row is left blank.
+HEADER = ("Item", "Amount", "Double", "Note")
+
+# Rough cost of one call over the UNO bridge to a running soffice, used for the
+# "bridge" estimate next to the in-process wall time.
+DEFAULT_LATENCY_US = 50
+
+DEFAULT_SIZES = "1000,10000,50000"
+
+
+def synthetic_rows(count: int) -> List[tuple]:
+    """Build a header plus count data rows (blank every tenth row)."""
+    rows = [HEADER]
+    distinct = max(1, count // 2)
+    for i in range(1, count + 1):
+        if i % 10 == 0:
+            rows.append(("",) * len(HEADER))
+            continue
+        amount = float(i % 997)
+        rows.append((f"  item {i % distinct}  ", amount,
+                     fake_uno.Formula(f"=B{i + 1}*2", amount * 2), "needs   a  trim "))
+    return rows
+
+
+def build_document(model: fake_uno.Model, macro: str, count: int) -> fake_uno.Document:
+    """Create the workbook a macro runs against and select its data, outside the count."""
+    if macro == "consolidate_all_sheets":
+        per_sheet = max(1, count // 3)
+        doc = fake_uno.Document(model, {f"Month {m}": synthetic_rows(per_sheet) for m in (1, 2, 3)})
+    else:
+        doc = fake_uno.Document(model, {"Data": synthetic_rows(count)})
+    fake_uno.select(doc)
+    return doc
+
+
+def run_one(macro_path: str, macro: str, count: int) -> Dict:
+    """Run macro once on a fresh document and return its call count and wall time."""
+    model = fake_uno.Model()
+    doc = build_document(model, macro, count)
+    context = fake_uno.ScriptContext(doc)
+    func = _load_macro(macro_path, macro, context)
+    with tempfile.TemporaryDirectory() as export_dir:
+        func.__globals__["EXPORT_DIR"] = export_dir   # keep exports off the Desktop
+        model.reset()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+    return {
+        "macro": macro,
+        "rows": count,
+        "calls": model.total(),
+        "wall_ms": round(elapsed * 1000, 2),
+        "top_calls": model.calls.most_common(3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count UNO calls and time the Calc macros "
+                                                 "on synthetic sheets.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated data row counts (default: {DEFAULT_SIZES}).")
+    parser.add_argument("--macros", default="",
+                        help="Comma-separated macro names (default: all exported macros).")
+    parser.add_argument("--latency-us", type=float, default=DEFAULT_LATENCY_US,
+                        help=f"Assumed cost of one UNO call for the bridge estimate "
+                             f"(default: {DEFAULT_LATENCY_US}).")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per run.")
+    args = parser.parse_args()
+
+    fake_uno.install()
+    macros = exported_macros()
+    names = [m for m in args.macros.split(",") if m] or sorted(macros)
+    unknown = [m for m in names if m not in macros]
+    if unknown:
+        parser.error(f"unknown macro(s): {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    if not args.json:
+        print(f"{'macro':36} {'rows':>8} {'UNO calls':>10} {'wall ms':>10} {'bridge ms':>10}  top calls")
+    for name in names:
+        for size in sizes:
+            result = run_one(macros[name], name, size)
+            result["bridge_ms"] = round(result["calls"] * args.latency_us / 1000, 1)
+            if args.json:
+                print(json.dumps(result))
+                continue
+            top = ", ".join(f"{call} x{n}" for call, n in result["top_calls"])
+            print(f"{name:36} {size:8} {result['calls']:10} {result['wall_ms']:10.1f} "
+                  f"{result['bridge_ms']:10.1f}  {top}")
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    main()
@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""
+In-process stand-in for the parts of the LibreOffice UNO API the Calc macros use.
+
+install() registers fake `uno` and `com.sun.star.*` modules so the macro files import
+without LibreOffice. Document, Sheet and CellRange model a workbook in plain Python and
+count every method call and property access in Model.calls, since each of those would be
+a round trip over the UNO bridge in a live Calc session.
+
+    model = Model()
+    doc = Document(model, {"Data": rows})
+    ctx = ScriptContext(doc)
+"""
+
+import sys
+import types
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+MAX_ROWS = 1048576
+MAX_COLUMNS = 16384
+
+# com.sun.star.table.CellContentType
+EMPTY, VALUE, TEXT, FORMULA = 0, 1, 2, 3
+
+# com.sun.star.sheet.CellFlags (the ones that matter here)
+CELL_FLAGS = {"VALUE": 1, "DATETIME": 2, "STRING": 4, "ANNOTATION": 8, "FORMULA": 16,
+              "HARDATTR": 32, "STYLES": 64, "OBJECTS": 128, "EDITATTR": 256, "FORMATTED": 512}
+
+_STRUCT_FIELDS = {
+    "com.sun.star.table.CellRangeAddress": ("Sheet", "StartColumn", "StartRow", "EndColumn", "EndRow"),
+    "com.sun.star.table.CellAddress": ("Sheet", "Column", "Row"),
+    "com.sun.star.awt.Rectangle": ("X", "Y", "Width", "Height"),
+}
+
+
+class Formula:
+    """A formula cell: its text and the result Calc last computed for it."""
+    __slots__ = ("text", "result")
+
+    def __init__(self, text: str, result):
+        self.text = text
+        self.result = result
+
+
+class Struct:
+    """A UNO struct. Structs are passed by value, so every property read builds a new one."""
+
+    def __init__(self, type_name: str, **values):
+        self.typeName = type_name
+        for field in _STRUCT_FIELDS.get(type_name, ()):
+            setattr(self, field, values.get(field, 0))
+
+
+class PropertyValue:
+    def __init__(self, Name: str = "", Value=None):
+        self.Name = Name
+        self.Value = Value
+
+
+def _range_address(sheet_index, left, top, right, bottom) -> Struct:
+    return Struct("com.sun.star.table.CellRangeAddress", Sheet=sheet_index, StartColumn=left,
+                  StartRow=top, EndColumn=right, EndRow=bottom)
+
+
+class Model:
+    """Call counter shared by every object of one fake document."""
+
+    def __init__(self):
+        self.calls: Counter = Counter()
+
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+class UnoObject:
+    """Base for fake UNO objects: counts public attribute reads and writes on the model."""
+
+    def __init__(self, model: Model):
+        object.__setattr__(self, "_model", model)
+
+    def __getattribute__(self, name):
+        if name[0] != "_":
+            object.__getattribute__(self, "_model").calls[name] += 1
+        return object.__getattribute__(self, name)
+
+    def __setattr__(self, name, value):
+        if name[0] != "_":
+            self._model.calls["set " + name] += 1
+        object.__setattr__(self, name, value)
+
+
+class CellRange(UnoObject):
+    """A rectangle of cells on a sheet; positions passed to its methods are relative to it."""
+
+    def __init__(self, model, sheet, left, top, right, bottom):
+        super().__init__(model)
+        if not (0 <= left <= right < MAX_COLUMNS and 0 <= top <= bottom < MAX_ROWS):
+            raise IndexError(f"invalid range ({left}, {top}, {right}, {bottom})")
+        self._sheet = sheet
+        self._box = (left, top, right, bottom)
+
+    # -- addressing ---------------------------------------------------------
+    @property
+    def RangeAddress(self):
+        return _range_address(self._sheet._index(), *self._box)
+
+    def getRangeAddress(self):
+        return _range_address(self._sheet._index(), *self._box)
+
+    @property
+    def Spreadsheet(self):
+        return self._sheet
+
+    @property
+    def Rows(self):
+        return _RowsOrColumns(self._model, self, rows=True)
+
+    @property
+    def Columns(self):
+        return _RowsOrColumns(self._model, self, rows=False)
+
+    def supportsService(self, name):
+        return name in ("com.sun.star.sheet.SheetCellRange", "com.sun.star.table.CellRange")
+
+    def getCellRangeByPosition(self, left, top, right, bottom):
+        l, t = self._box[0], self._box[1]
+        return CellRange(self._model, self._sheet, l + left, t + top, l + right, t + bottom)
+
+    def getCellByPosition(self, column, row):
+        return Cell(self._model, self._sheet, self._box[0] + column, self._box[1] + row)
+
+    # -- bulk data ----------------------------------------------------------
+    def getDataArray(self):
+        left, top, right, bottom = self._box
+        grid = self._sheet._grid
+        out = []
+        for r in range(top, bottom + 1):
+            row = grid.get(r)
+            if not row:
+                out.append(("",) * (right - left + 1))
+                continue
+            values = []
+            for c in range(left, right + 1):
+                v = row.get(c, "")
+                values.append(v.result if isinstance(v, Formula) else v)
+            out.append(tuple(values))
+        return tuple(out)
+
+    def setDataArray(self, data):
+        left, top, right, bottom = self._box
+        if len(data) != bottom - top + 1 or any(len(row) != right - left + 1 for row in data):
+            raise RuntimeError("setDataArray: array size does not match the range")
+        for r, row in enumerate(data, top):
+            for c, value in enumerate(row, left):
+                self._sheet._put(c, r, value if value != "" else None)
+
+    def getFormulaArray(self):
+        left, top, right, bottom = self._box
+        grid = self._sheet._grid
+        out = []
+        for r in range(top, bottom + 1):
+            row = grid.get(r, {})
+            values = []
+            for c in range(left, right + 1):
+                v = row.get(c, "")
+                values.append(v.text if isinstance(v, Formula) else
+                              (v if isinstance(v, str) else repr(v)))
+            out.append(tuple(values))
+        return tuple(out)
+
+    def queryContentCells(self, flags):
+        """Only FORMULA is modelled: returns the formula cells, merged into column runs."""
+        left, top, right, bottom = self._box
+        ranges = SheetCellRanges(self._model, self._sheet._doc)
+        if flags & CELL_FLAGS["FORMULA"]:
+            index = self._sheet._index()
+            found = sorted((c, r) for r, cells in self._sheet._grid.items() if top <= r <= bottom
+                           for c, v in cells.items()
+                           if left <= c <= right and isinstance(v, Formula))
+            for c, r in found:
+                last = ranges._addresses[-1] if ranges._addresses else None
+                if last is not None and last.StartColumn == c and last.EndRow == r - 1:
+                    last.EndRow = r
+                else:
+                    ranges._addresses.append(_range_address(index, c, r, c, r))
+        return ranges
+
+    def clearContents(self, flags):
+        left, top, right, bottom = self._box
+        for r, cells in list(self._sheet._grid.items()):
+            if top <= r <= bottom:
+                for c in [c for c in cells if left <= c <= right]:
+                    self._sheet._put(c, r, None)
+
+
+class Cell(CellRange):
+    def __init__(self, model, sheet, column, row):
+        super().__init__(model, sheet, column, row, column, row)
+
+    def _raw(self):
+        return self._sheet._grid.get(self._box[1], {}).get(self._box[0])
+
+    @property
+    def Type(self):
+        v = self._raw()
+        if v is None:
+            return EMPTY
+        if isinstance(v, Formula):
+            return FORMULA
+        return TEXT if isinstance(v, str) else VALUE
+
+    @property
+    def String(self):
+        v = self._raw()
+        v = v.result if isinstance(v, Formula) else v
+        return "" if v is None else (v if isinstance(v, str) else repr(v))
+
+    @String.setter
+    def String(self, text):
+        self._sheet._put(self._box[0], self._box[1], text or None)
+
+    @property
+    def Value(self):
+        v = self._raw()
+        v = v.result if isinstance(v, Formula) else v
+        return v if isinstance(v, float) else 0.0
+
+    @Value.setter
+    def Value(self, number):
+        self._sheet._put(self._box[0], self._box[1], float(number))
+
+    @property
+    def Formula(self):
+        v = self._raw()
+        if isinstance(v, Formula):
+            return v.text
+        return "" if v is None else (v if isinstance(v, str) else repr(v))
+
+    @Formula.setter
+    def Formula(self, text):
+        if text.startswith("="):
+            self._sheet._put(self._box[0], self._box[1], Formula(text, 0.0))
+        else:
+            self._sheet._put(self._box[0], self._box[1], text or None)
+
+    FormulaLocal = Formula
+
+
+class _RowsOrColumns(UnoObject):
+    def __init__(self, model, cell_range, rows):
+        super().__init__(model)
+        self._range = cell_range
+        self._rows = rows
+
+    def getCount(self):
+        left, top, right, bottom = self._range._box
+        return bottom - top + 1 if self._rows else right - left + 1
+
+    def removeByIndex(self, index, count):
+        self._range._sheet._shift_rows(index, -count)
+
+    def insertByIndex(self, index, count):
+        self._range._sheet._shift_rows(index, count)
+
+
+class Cursor(CellRange):
+    def gotoStartOfUsedArea(self, expand):
+        used = self._sheet._used_box()
+        self._box = used[:2] + (self._box[2:] if expand else used[:2])
+
+    def gotoEndOfUsedArea(self, expand):
+        used = self._sheet._used_box()
+        self._box = (self._box[:2] if expand else used[2:]) + used[2:]
+
+
+class Sheet(CellRange):
+    def __init__(self, model, doc, name):
+        super().__init__(model, self, 0, 0, MAX_COLUMNS - 1, MAX_ROWS - 1)
+        self._doc = doc
+        self._name = name
+        self._grid: Dict[int, Dict[int, object]] = {}
+
+    def _index(self):
+        return self._doc._sheet_list.index(self)
+
+    def _put(self, column, row, value):
+        if value is None:
+            cells = self._grid.get(row)
+            if cells:
+                cells.pop(column, None)
+                if not cells:
+                    del self._grid[row]
+        else:
+            self._grid.setdefault(row, {})[column] = value
+
+    def _shift_rows(self, index, delta):
+        """Insert (delta > 0) or delete (delta < 0) rows at index, moving the rest."""
+        grid = {}
+        for r, cells in self._grid.items():
+            if r < index:
+                grid[r] = cells
+            elif delta < 0 and r < index - delta:
+                continue
+            else:
+                grid[r + delta] = cells
+        self._grid = grid
+
+    def _used_box(self):
+        if not self._grid:
+            return (0, 0, 0, 0)
+        cols = [c for cells in self._grid.values() for c in cells]
+        return (min(cols), min(self._grid), max(cols), max(self._grid))
+
+    def getName(self):
+        return self._name
+
+    def createCursor(self):
+        return Cursor(self._model, self, 0, 0, 0, 0)
+
+    def copyRange(self, dest, source):
+        src = self._doc._sheet_list[source.Sheet]
+        for r in range(source.StartRow, source.EndRow + 1):
+            cells = src._grid.get(r, {})
+            for c in range(source.StartColumn, source.EndColumn + 1):
+                v = cells.get(c)
+                self._put(dest.Column + c - source.StartColumn, dest.Row + r - source.StartRow,
+                          Formula(v.text, v.result) if isinstance(v, Formula) else v)
+
+
+class SheetCellRanges(UnoObject):
+    def __init__(self, model, doc):
+        super().__init__(model)
+        self._doc = doc
+        self._addresses: List[Struct] = []
+
+    def addRangeAddresses(self, addresses, merge):
+        self._addresses.extend(addresses)
+
+    def getRangeAddresses(self):
+        return tuple(self._addresses)
+
+    def getCount(self):
+        return len(self._addresses)
+
+
+class Sheets(UnoObject):
+    def __init__(self, model, doc):
+        super().__init__(model)
+        self._doc = doc
+
+    def getElementNames(self):
+        return tuple(s._name for s in self._doc._sheet_list)
+
+    def hasByName(self, name):
+        return name in self.getElementNames()
+
+    def getByName(self, name):
+        for s in self._doc._sheet_list:
+            if s._name == name:
+                return s
+        raise KeyError(name)
+
+    def getByIndex(self, index):
+        return self._doc._sheet_list[index]
+
+    def getCount(self):
+        return len(self._doc._sheet_list)
+
+    def insertNewByName(self, name, position):
+        self._doc._sheet_list.insert(position, Sheet(self._model, self._doc, name))
+
+
+class _StatusIndicator(UnoObject):
+    def start(self, text, steps):
+        pass
+
+    def setValue(self, value):
+        pass
+
+    def end(self):
+        pass
+
+
+class Frame(UnoObject):
+    def createStatusIndicator(self):
+        return _StatusIndicator(self._model)
+
+
+class Controller(UnoObject):
+    def __init__(self, model, doc):
+        super().__init__(model)
+        self._doc = doc
+        self._active = None
+        self._selection = None
+        self.Frame = Frame(model)
+
+    def getFrame(self):
+        return self.Frame
+
+    def getActiveSheet(self):
+        return self._active or self._doc._sheet_list[0]
+
+    def setActiveSheet(self, sheet):
+        self._active = sheet
+
+    def select(self, selection):
+        self._selection = selection
+        return True
+
+    def getSelection(self):
+        return self._selection
+
+    def unfreeze(self):
+        pass
+
+    def freezeAtPosition(self, column, row):
+        pass
+
+
+class _UndoManager(UnoObject):
+    def __init__(self, model):
+        super().__init__(model)
+        self._depth = 0
+
+    def enterUndoContext(self, title):
+        self._depth += 1
+
+    def leaveUndoContext(self):
+        if not self._depth:
+            raise RuntimeError("leaveUndoContext without enterUndoContext")
+        self._depth -= 1
+
+
+class _DatabaseRange(UnoObject):
+    def __init__(self, model, area):
+        super().__init__(model)
+        self._area = area
+        self.AutoFilter = False
+
+    def setDataArea(self, area):
+        self._area = area
+
+
+class _DatabaseRanges(UnoObject):
+    def __init__(self, model):
+        super().__init__(model)
+        self._ranges: Dict[str, _DatabaseRange] = {}
+
+    def hasByName(self, name):
+        return name in self._ranges
+
+    def getByName(self, name):
+        return self._ranges[name]
+
+    def addNewByName(self, name, area):
+        self._ranges[name] = _DatabaseRange(self._model, area)
+
+
+class Document(UnoObject):
+    """A spreadsheet document built from {sheet name: list of rows}."""
+
+    def __init__(self, model: Model, sheets: Dict[str, Sequence[Sequence]]):
+        super().__init__(model)
+        self._sheet_list: List[Sheet] = []
+        for name, rows in sheets.items():
+            sheet = Sheet(model, self, name)
+            for r, row in enumerate(rows):
+                for c, value in enumerate(row):
+                    sheet._put(c, r, None if value == "" else value)
+            self._sheet_list.append(sheet)
+        self._controller = Controller(model, self)
+        self._autocalc = True
+        self._locks = 0
+        self.UndoManager = _UndoManager(model)
+        self.DatabaseRanges = _DatabaseRanges(model)
+        self.stored: List[str] = []
+
+    @property
+    def CurrentController(self):
+        return self._controller
+
+    def getCurrentController(self):
+        return self._controller
+
+    def getCurrentSelection(self):
+        return self._controller._selection
+
+    def getSheets(self):
+        return Sheets(self._model, self)
+
+    def createInstance(self, name):
+        if name == "com.sun.star.sheet.SheetCellRanges":
+            return SheetCellRanges(self._model, self)
+        raise ValueError(f"service not modelled: {name}")
+
+    def lockControllers(self):
+        self._locks += 1
+
+    def unlockControllers(self):
+        self._locks -= 1
+
+    def addActionLock(self):
+        pass
+
+    def removeActionLock(self):
+        pass
+
+    def isAutomaticCalculationEnabled(self):
+        return self._autocalc
+
+    def enableAutomaticCalculation(self, enabled):
+        self._autocalc = enabled
+
+    def calculate(self):
+        pass
+
+    def calculateAll(self):
+        pass
+
+    def storeToURL(self, url, props):
+        self.stored.append(url)
+
+    def store(self):
+        pass
+
+
+class _ServiceManager(UnoObject):
+    def createInstanceWithContext(self, name, ctx):
+        raise ValueError(f"service not modelled: {name}")
+
+
+class ComponentContext(UnoObject):
+    def __init__(self, model):
+        super().__init__(model)
+        self.ServiceManager = _ServiceManager(model)
+
+
+class ScriptContext:
+    """XSCRIPTCONTEXT for a fake document. Message boxes end up in .messages."""
+
+    def __init__(self, document: Document):
+        self.document = document
+        self.messages: List[str] = []
+        self._ctx = ComponentContext(document._model)
+
+    def getDocument(self):
+        return self.document
+
+    def getDesktop(self):
+        return None
+
+    def getComponentContext(self):
+        return self._ctx
+
+    def message(self, msg, title=None):
+        self.messages.append(" ".join(str(msg).split()))
+
+
+def select(document: Document, sheet_name: Optional[str] = None, box=None):
+    """Select box (left, top, right, bottom) or the used area of a sheet, outside the count."""
+    sheet = document._sheet_list[0] if sheet_name is None else \
+        next(s for s in document._sheet_list if s._name == sheet_name)
+    box = box or sheet._used_box()
+    document._controller._active = sheet
+    document._controller._selection = CellRange(document._model, sheet, *box)
+
+
+def install():
+    """Register the fake `uno` and `com.sun.star.*` modules in sys.modules."""
+    def module(name, **attrs):
+        mod = types.ModuleType(name)
+        mod.__dict__.update(attrs)
+        sys.modules[name] = mod
+        return mod
+
+    module("uno",
+           createUnoStruct=lambda type_name, *args: Struct(type_name),
+           systemPathToFileUrl=lambda path: "file://" + path,
+           fileUrlToSystemPath=lambda url: url[len("file://"):] if url.startswith("file://") else url)
+    for name in ("com", "com.sun", "com.sun.star", "com.sun.star.awt", "com.sun.star.sheet",
+                 "com.sun.star.table"):
+        module(name)
+    module("com.sun.star.awt.FontWeight", BOLD=150.0, NORMAL=100.0)
+    module("com.sun.star.beans", PropertyValue=PropertyValue)
+    module("com.sun.star.sheet.CellFlags", **CELL_FLAGS)
+    module("com.sun.star.table.CellContentType", EMPTY=EMPTY, VALUE=VALUE, TEXT=TEXT, FORMULA=FORMULA)
+    module("com.sun.star.lang", DisposedException=type("DisposedException", (Exception,), {}))
+    module("com.sun.star.connection", NoConnectException=type("NoConnectException", (Exception,), {}))
@@ -97,6 +97,7 @@ if command -v libreoffice &> /dev/null; then
     echo "✓ LibreOffice is installed"
     # The macro path for Linux can vary, this is a common one
     LIBREOFFICE_PYTHON_DIR="$HOME/.config/libreoffice/4/user/Scripts/python"
+    # Only the top-level files are macros; libreoffice/tools/ holds command-line helpers.
     MACRO_SRC_DIR="$REPO_DIR/libreoffice"
     if ls "$MACRO_SRC_DIR"/*.py &> /dev/null; then
         mkdir -p "$LIBREOFFICE_PYTHON_DIR"
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Python tools (the bash functions are timed by performance_test.sh).
+
+Measures:
+  organize     organize_files.organize_directory on a generated tree
+  serve        serve-file.py download throughput and small-file request rate
+  mac_manager  CLI startup ('validate --plain') and 'bulk' validation rate; first checks
+               that 'bulk' and 'analyze' report the same vendors
+  trim         litellm_trim._trim on synthetic transcripts (exact and estimator counting)
+
+Results are written as JSON and compared against a saved baseline; a metric that got
+worse by more than --threshold percent is reported as a regression.
+
+    python3 tests/python_bench.py                      # run everything, compare to baseline
+    python3 tests/python_bench.py --only organize,trim --save-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import shutil
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+import subprocess
+import threading
+import urllib.request
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+HERE = Path(__file__).resolve().parent
+
+# Where the tools live: in a checkout they are two levels up; in the linux/tests image
+# docker-compose mounts them into the test user's home.
+ROOT = Path(os.environ.get("DOTFILES_ROOT", HERE.parent.parent))
+PYTHON_DIR = next((p for p in (ROOT / "python", Path.home() / "python") if p.is_dir()), ROOT / "python")
+VIBE_DIR = next((p for p in (ROOT / "shared/vibe", Path.home() / "vibe") if p.is_dir()), ROOT / "shared/vibe")
+
+OUTPUT_DIR = Path.home() / "test_output" if (Path.home() / "test_output").is_dir() else HERE / "test_output"
+DEFAULT_OUTPUT = OUTPUT_DIR / "python_bench.json"
+DEFAULT_BASELINE = OUTPUT_DIR / "python_bench_baseline.json"
+
+# Percent change past which a metric counts as a regression.
+DEFAULT_THRESHOLD = 10.0
+
+Metrics = Dict[str, Dict]
+
+
+def metric(value: float, unit: str, lower_is_better: bool = True) -> Dict:
+    return {"value": round(value, 3), "unit": unit, "lower_is_better": lower_is_better}
+
+
+def timed_runs(func: Callable[[], None], runs: int, setup: Optional[Callable[[], None]] = None) -> List[float]:
+    """Call func `runs` times (after setup, which is not timed) and return seconds per run."""
+    times = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# ── organize_files ────────────────────────────────────────────────────────────
+ORGANIZE_EXTENSIONS = ["txt", "pdf", "jpg", "png", "zip", "csv", "json", "mp3", "py", "md"]
+
+
+def bench_organize(quick: bool) -> Metrics:
+    sys.path.insert(0, str(PYTHON_DIR))
+    import organize_files
+
+    count = 1000 if quick else 5000
+    runs = 3 if quick else 5
+    work = Path(tempfile.mkdtemp(prefix="bench-organize-"))
+
+    def generate():
+        shutil.rmtree(work, ignore_errors=True)
+        work.mkdir()
+        for i in range(count):
+            (work / f"file_{i}.{ORGANIZE_EXTENSIONS[i % len(ORGANIZE_EXTENSIONS)]}").write_bytes(b"x" * 128)
+
+    def organize():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            organize_files.organize_directory(str(work))
+
+    try:
+        times = timed_runs(organize, runs, setup=generate)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    best = min(times)
+    return {
+        "organize.seconds": metric(statistics.median(times), "s"),
+        "organize.files_per_s": metric(count / best, "files/s", lower_is_better=False),
+    }
+
+
+# ── serve-file.py ─────────────────────────────────────────────────────────────
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError), socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return
+        time.sleep(0.05)
+    raise RuntimeError(f"serve-file.py did not start listening on port {port}")
+
+
+def _fetch(url: str) -> int:
+    with urllib.request.urlopen(url, timeout=30) as response:
+        total = 0
+        while True:
+            chunk = response.read(1 << 20)
+            if not chunk:
+                return total
+            total += len(chunk)
+
+
+def bench_serve(quick: bool) -> Metrics:
+    size_mb = 32 if quick else 256
+    small_requests = 200 if quick else 1000
+    clients = 8
+    work = Path(tempfile.mkdtemp(prefix="bench-serve-"))
+    with open(work / "big.bin", "wb") as f:
+        block = os.urandom(1 << 20)
+        for _ in range(size_mb):
+            f.write(block)
+    (work / "small.txt").write_bytes(b"hello\n" * 100)
+
+    port = _free_port()
+    server = subprocess.Popen([sys.executable, str(PYTHON_DIR / "serve-file.py"), str(port), str(work)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port)
+        base = f"http://127.0.0.1:{port}"
+
+        times = timed_runs(lambda: _fetch(f"{base}/big.bin"), 3)
+        throughput = size_mb / min(times)
+
+        remaining = list(range(small_requests))
+        lock = threading.Lock()
+
+        def client():
+            while True:
+                with lock:
+                    if not remaining:
+                        return
+                    remaining.pop()
+                _fetch(f"{base}/small.txt")
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        rate = small_requests / (time.perf_counter() - start)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "serve.download_mb_per_s": metric(throughput, "MB/s", lower_is_better=False),
+        "serve.small_requests_per_s": metric(rate, "req/s", lower_is_better=False),
+    }
+
+
+# ── mac_manager ───────────────────────────────────────────────────────────────
+# One built-in vendor prefix in every notation 'bulk' recognizes.
+VENDOR_SAMPLES = ["00:50:56:aa:bb:cc", "00-50-56-AA-BB-CC", "0050.56aa.bbcc", "005056aabbcc",
+                  "08:00:27:01:02:03", "52:54:00:12:34:56"]
+
+
+def check_mac_vendors(script: str, env: Dict[str, str]):
+    """Fail if 'bulk' and 'analyze --offline' disagree on a vendor."""
+    out = subprocess.run([sys.executable, script, "bulk", "-"], input="\n".join(VENDOR_SAMPLES),
+                         capture_output=True, text=True, env=env, check=True).stdout
+    bulk = [json.loads(line)["vendor"] for line in out.splitlines()]
+    if len(bulk) != len(VENDOR_SAMPLES):
+        raise RuntimeError(f"bulk found {len(bulk)} of {len(VENDOR_SAMPLES)} sample MACs")
+    for mac, vendor in zip(VENDOR_SAMPLES, bulk):
+        out = subprocess.run([sys.executable, script, "analyze", mac, "--plain", "--offline"],
+                             capture_output=True, text=True, env=env, check=True).stdout
+        expected = next(line.split(":", 1)[1].strip() for line in out.splitlines() if line.startswith("Vendor:"))
+        if vendor != expected:
+            raise RuntimeError(f"vendor mismatch for {mac}: bulk {vendor!r}, analyze {expected!r}")
+
+
+def bench_mac_manager(quick: bool) -> Metrics:
+    script = str(PYTHON_DIR / "mac_manager.py")
+    # No offline OUI database and no network: results don't depend on the host.
+    env = dict(os.environ, MAC_MANAGER_OUI_DB=os.devnull, MAC_MANAGER_PLAIN="1")
+    runs = 10 if quick else 30
+    check_mac_vendors(script, env)
+
+    def startup():
+        subprocess.run([sys.executable, script, "validate", "00:11:22:33:44:55", "--plain"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, check=True)
+
+    startup()  # warm the page cache
+    startup_times = timed_runs(startup, runs)
+
+    lines = 100_000 if quick else 1_000_000
+    rng = random.Random(0)
+    work = Path(tempfile.mkdtemp(prefix="bench-mac-"))
+    leases = work / "leases.txt"
+    with open(leases, "w") as f:
+        for i in range(lines):
+            mac = ":".join(f"{rng.randrange(256):02x}" for _ in range(6))
+            f.write(f"lease 10.0.{i // 256 % 256}.{i % 256} {{ hardware ethernet {mac}; }}\n")
+    try:
+        bulk_times = timed_runs(lambda: subprocess.run(
+            [sys.executable, script, "bulk", str(leases), "--plain"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env, check=True), 3)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "mac_manager.startup_ms": metric(statistics.median(startup_times) * 1000, "ms"),
+        "mac_manager.bulk_rows_per_s": metric(lines / min(bulk_times), "rows/s", lower_is_better=False),
+    }
+
+
+# ── litellm_trim ──────────────────────────────────────────────────────────────
+def synthetic_transcript(turns: int, rng: random.Random) -> List[dict]:
+    """A long agent session: a big system prompt, then alternating turns with tool output."""
+    words = ["def", "return", "self", "import", "value", "error", "test", "config", "path", "data"]
+
+    def text(n):
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    messages = [{"role": "system", "content": text(8000)}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": text(rng.randint(20, 400))})
+        messages.append({"role": "assistant", "content": [
+            {"type": "text", "text": text(rng.randint(20, 200))},
+            {"type": "tool_use", "name": "read_file", "input": {"path": f"src/module_{i}.py"}},
+        ]})
+        messages.append({"role": "user", "content": [
+            {"type": "tool_result", "content": text(rng.randint(200, 3000))},
+        ]})
+    return messages
+
+
+def bench_trim(quick: bool) -> Metrics:
+    sys.path.insert(0, str(VIBE_DIR))
+    os.environ.setdefault("LITELLM_TRIM_LOG", os.devnull)
+    os.environ["LITELLM_TRIM_PREWARM"] = "0"
+    try:
+        import litellm_trim
+    except ImportError as e:
+        print(f"  skipped: {e} (pip install litellm)")
+        return {}
+
+    model = "mistral/devstral-medium-latest"
+    transcript = synthetic_transcript(150 if quick else 400, random.Random(0))
+    runs = 3 if quick else 5
+    results = {}
+
+    # Estimator only, as before a tokenizer is warm or with the breaker open.
+    estimate = timed_runs(lambda: litellm_trim._trim(
+        transcript, model, litellm_trim.TARGET_TOKENS, litellm_trim._Deadline(0, expired=True)), runs)
+    results["trim.estimate_ms"] = metric(statistics.median(estimate) * 1000, "ms")
+
+    # Exact counting with a warm tokenizer and no time budget.
+    litellm_trim._warm([model])
+    exact = timed_runs(lambda: litellm_trim._trim(
+        transcript, model, litellm_trim.TARGET_TOKENS, litellm_trim._Deadline(0)), runs)
+    results["trim.exact_ms"] = metric(statistics.median(exact) * 1000, "ms")
+    return results
+
+
+BENCHMARKS = {
+    "organize": bench_organize,
+    "serve": bench_serve,
+    "mac_manager": bench_mac_manager,
+    "trim": bench_trim,
+}
+
+
+def compare(results: Metrics, baseline: Metrics, threshold: float) -> List[str]:
+    """Print each metric next to its baseline and return the names that regressed."""
+    regressions = []
+    print(f"\n{'metric':32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or not base["value"]:
+            print(f"{name:32} {'-':>12} {current['value']:>12} {'new':>9}")
+            continue
+        change = (current["value"] - base["value"]) / base["value"] * 100
+        worse = change if current["lower_is_better"] else -change
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:32} {base['value']:>12} {current['value']:>12} {change:+8.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python tools and compare with a baseline.")
+    parser.add_argument("--only", default="", help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs and fewer runs.")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT),
+                        help=f"Where to write the results (default: {DEFAULT_OUTPUT}).")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE),
+                        help=f"Baseline results to compare with (default: {DEFAULT_BASELINE}).")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Percent change counted as a regression (default: {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any metric regressed.")
+    args = parser.parse_args()
+
+    selected = [b for b in args.only.split(",") if b] or list(BENCHMARKS)
+    unknown = [b for b in selected if b not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results: Metrics = {}
+    for name in selected:
+        print(f"Running {name}...")
+        try:
+            results.update(BENCHMARKS[name](args.quick))
+        except Exception as e:
+            print(f"  failed: {e}")
+
+    report = {
+        "meta": {
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    for path in [args.output] + ([args.baseline] if args.save_baseline else []):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {path}")
+
+    regressions = []
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("quick") != args.quick:
+            print("Note: baseline was recorded with a different --quick setting.")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+    else:
+        for name, m in results.items():
+            print(f"{name:32} {m['value']:>12} {m['unit']}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
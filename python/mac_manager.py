@@ -2,34 +2,245 @@
 """
 Advanced MAC Address Manager
 Provides detailed, cross-platform MAC address operations with live vendor lookup and rich formatting.
+
+This is the single implementation used on every platform (linux/python_helpers/mac_manager.py
+is a thin entry point for the shell helpers). Shell aliases call it constantly, so heavy
+dependencies are imported only on the code paths that need them: `requests` for online
+vendor lookups and `rich` for formatted output. Pass --plain (or set MAC_MANAGER_PLAIN=1)
+for plain-text output without rich.
 """
 
+import os
 import re
 import sys
-import subprocess
+import functools
+import time
+import threading
 import platform
 import argparse
-import requests
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, Iterator, Optional, List, Tuple
 
-try:
-    from rich.console import Console
-    from rich.table import Table
-    from rich.panel import Panel
-    from rich.text import Text
-except ImportError:
-    print("Error: 'rich' library not found. Please install it with 'pip install rich'", file=sys.stderr)
-    sys.exit(1)
+import oui_db
+
+_console = None
+
+
+def get_console():
+    """Create the rich console on first use, so plain-text runs never import rich."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+
+def rich_available() -> bool:
+    import importlib.util
+    return importlib.util.find_spec('rich') is not None
+
+VENDOR_NOT_FOUND = "Vendor not found in public registry"
+VENDOR_UNREACHABLE = "Unable to connect to vendor API"
+VENDOR_LOCAL = "Locally administered (no vendor)"
+VENDOR_UNKNOWN = "Unknown Vendor"
+
+DEFAULT_VENDOR_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")),
+    "mac_manager", "vendors.json",
+)
+
+DEFAULT_INVENTORY_SNAPSHOT = os.path.join(os.path.dirname(DEFAULT_VENDOR_CACHE), "inventory.json")
+
+PROC_NET_ARP = '/proc/net/arp'
+# ATF_COM from linux/if_arp.h: the entry is complete (has a resolved hardware address).
+_ATF_COM = 0x02
+
+SYSFS_NET = '/sys/class/net'
+
+# ARPHRD_* link types from linux/if_arp.h worth naming; anything else shows its number.
+ARPHRD_ETHER = 1
+ARPHRD_NAMES = {
+    1: 'ether',
+    32: 'infiniband',
+    768: 'ipip',
+    769: 'ip6tnl',
+    772: 'loopback',
+    776: 'sit',
+    778: 'gre',
+    803: 'radiotap',
+    823: 'ip6gre',
+    65534: 'none',
+}
+
+
+def _read_sysfs_attr(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _sysfs_link_kind(base: str, arphrd: int) -> str:
+    """Name an interface's type, telling apart the kinds of Ethernet-like devices."""
+    if arphrd != ARPHRD_ETHER:
+        return ARPHRD_NAMES.get(arphrd, str(arphrd))
+    if os.path.exists(os.path.join(base, 'wireless')) or os.path.exists(os.path.join(base, 'phy80211')):
+        return 'wireless'
+    if os.path.exists(os.path.join(base, 'bridge')):
+        return 'bridge'
+    if os.path.exists(os.path.join(base, 'bonding')):
+        return 'bond'
+    if not os.path.exists(os.path.join(base, 'device')):
+        # No backing hardware: veth, dummy, ifb, tap, ...
+        return 'virtual'
+    return 'ether'
+
+
+def read_sysfs_interfaces() -> Optional[List[dict]]:
+    """
+    Read every interface's MAC, operstate and type from /sys/class/net in one pass.
+
+    Returns None if sysfs is not available, so callers can fall back to `ip`.
+    """
+    try:
+        names = sorted(os.listdir(SYSFS_NET))
+    except OSError:
+        return None
+    interfaces = []
+    for name in names:
+        base = os.path.join(SYSFS_NET, name)
+        arphrd = _read_sysfs_attr(os.path.join(base, 'type'))
+        arphrd = int(arphrd) if arphrd and arphrd.isdigit() else -1
+        interfaces.append({
+            'name': name,
+            'mac': (_read_sysfs_attr(os.path.join(base, 'address')) or '').lower(),
+            'operstate': _read_sysfs_attr(os.path.join(base, 'operstate')) or 'unknown',
+            'type': _sysfs_link_kind(base, arphrd),
+            'arphrd': arphrd,
+        })
+    return interfaces
+
+
+def read_sysfs_mac(interface: str) -> Optional[str]:
+    """Read one Ethernet-type interface's MAC from sysfs; None if absent or not Ethernet."""
+    if not interface or '/' in interface or interface in ('.', '..'):
+        return None
+    base = os.path.join(SYSFS_NET, interface)
+    if _read_sysfs_attr(os.path.join(base, 'type')) != str(ARPHRD_ETHER):
+        return None
+    mac = _read_sysfs_attr(os.path.join(base, 'address'))
+    return mac.lower() if mac else None
+
+
+class VendorCache:
+    """
+    On-disk cache of vendor API answers, keyed by OUI (the first three octets).
+
+    Found vendors are kept for `ttl` seconds; "not found" answers are cached too,
+    for the shorter `negative_ttl`, so unknown prefixes are not re-queried on every run.
+    """
+
+    def __init__(self, path: str = DEFAULT_VENDOR_CACHE, ttl: float = 30 * 86400,
+                 negative_ttl: float = 86400):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.dirty = False
+        import json
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(mac: str) -> str:
+        return mac.lower()[:8]
+
+    def get(self, mac: str) -> Tuple[bool, Optional[str]]:
+        """Return (hit, vendor); vendor is None for a cached "not found"."""
+        entry = self.entries.get(self.key(mac))
+        if not entry:
+            return False, None
+        ttl = self.ttl if entry.get("vendor") else self.negative_ttl
+        if time.time() - entry.get("ts", 0) > ttl:
+            return False, None
+        return True, entry.get("vendor")
+
+    def put(self, mac: str, vendor: Optional[str]):
+        with self.lock:
+            self.entries[self.key(mac)] = {"vendor": vendor, "ts": time.time()}
+            self.dirty = True
+
+    def save(self):
+        """Write the cache back to disk atomically, if anything changed."""
+        with self.lock:
+            if not self.dirty:
+                return
+            import json
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f)
+                os.replace(tmp_path, self.path)
+                self.dirty = False
+            except OSError:
+                pass
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
 
-console = Console()
 
 class MACAddressManager:
     """Manages MAC address operations with advanced features."""
     
-    VENDOR_API_URL = "https://api.macvendors.com/"
+    # Well-known virtualization OUIs, answered even without the offline OUI database.
+    KNOWN_VENDORS = {
+        "00:00:5e": "IANA",
+        "00:50:56": "VMware",
+        "08:00:27": "VirtualBox",
+        "52:54:00": "QEMU/KVM",
+        "00:16:3e": "Xen",
+        "00:1c:42": "Parallels",
+        "ac:de:48": "Apple",
+        "00:03:93": "Apple",
+    }
+
+    # Named addresses (e.g. PHONE_MAC=aa:bb:...) are read from this file for 'set' and 'show'.
+    ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+
+    VENDOR_API_URL = os.environ.get("MAC_VENDOR_API_URL", "https://api.macvendors.com/")
+    # The free macvendors.com tier allows 2 requests per second.
+    VENDOR_API_RATE = 2.0
+    VENDOR_API_TIMEOUT = 5.0
+    VENDOR_LOOKUP_WORKERS = 4
     
-    def __init__(self):
+    def __init__(self, vendor_cache: Optional[VendorCache] = None, online: bool = True):
         self.platform = platform.system()
+        # With online=False, vendors come from the offline OUI database and cache only.
+        self.online = online
+        self._oui_db = None
+        self._oui_db_loaded = False
+        self._vendor_cache = vendor_cache
+        self._rate_limiter = RateLimiter(self.VENDOR_API_RATE)
+        self._http = threading.local()
+        self._stored_macs = None
         
     def validate_mac(self, mac: str) -> Tuple[bool, str]:
         """Validate and normalize a MAC address."""
@@ -39,17 +250,95 @@ class MACAddressManager:
         normalized = ':'.join(clean[i:i+2] for i in range(0, 12, 2)).lower()
         return True, normalized
     
-    def get_vendor(self, mac: str) -> str:
-        """Fetch vendor information from an online API."""
+    def get_offline_vendor(self, mac: str) -> Optional[str]:
+        """Look up the vendor in the offline OUI database (see oui_db.py) or KNOWN_VENDORS."""
+        if not self._oui_db_loaded:
+            self._oui_db_loaded = True
+            self._oui_db = oui_db.open_default()
+        if self._oui_db is not None:
+            vendor = self._oui_db.lookup(mac)
+            if vendor:
+                return vendor
+        return self.KNOWN_VENDORS.get(mac.lower()[:8])
+
+    @property
+    def vendor_cache(self) -> VendorCache:
+        if self._vendor_cache is None:
+            self._vendor_cache = VendorCache()
+        return self._vendor_cache
+
+    def _query_vendor_api(self, mac: str) -> str:
+        """Ask the online API (rate limited, with a timeout), caching definitive answers."""
         try:
-            response = requests.get(f"{self.VENDOR_API_URL}{mac}")
+            import requests
+        except ImportError:
+            return VENDOR_UNREACHABLE
+        session = getattr(self._http, 'session', None)
+        if session is None:
+            session = self._http.session = requests.Session()
+        for attempt in range(2):
+            self._rate_limiter.wait()
+            try:
+                response = session.get(f"{self.VENDOR_API_URL}{mac}", timeout=self.VENDOR_API_TIMEOUT)
+            except requests.RequestException:
+                return VENDOR_UNREACHABLE
             if response.status_code == 200:
+                self.vendor_cache.put(mac, response.text)
                 return response.text
-            elif response.status_code == 404:
-                return "Vendor not found in public registry"
-        except requests.RequestException:
-            return "Unable to connect to vendor API"
-        return "Unknown Vendor"
+            if response.status_code == 404:
+                self.vendor_cache.put(mac, None)
+                return VENDOR_NOT_FOUND
+            if response.status_code == 429 and attempt == 0:
+                # Over the rate limit anyway (e.g. another client on this IP); back off once.
+                time.sleep(1.0)
+                continue
+            break
+        return VENDOR_UNKNOWN
+
+    def get_vendors(self, macs: Iterable[str], online: Optional[bool] = None) -> Dict[str, str]:
+        """
+        Resolve vendors for many MAC addresses at once.
+
+        Locally administered addresses and anything in the offline database or the
+        vendor cache are answered without the network. The rest are looked up once
+        per OUI, concurrently on a small pool, respecting the API rate limit. When offline
+        (online=False, or the manager's default) they are reported as VENDOR_UNKNOWN instead.
+        """
+        online = self.online if online is None else online
+        results = {}
+        pending = {}
+        for mac in macs:
+            if mac in results:
+                continue
+            vendor = self.get_offline_vendor(mac)
+            if vendor:
+                results[mac] = vendor
+                continue
+            if self.is_locally_administered(mac):
+                results[mac] = VENDOR_LOCAL
+                continue
+            hit, vendor = self.vendor_cache.get(mac)
+            if hit:
+                results[mac] = vendor or VENDOR_NOT_FOUND
+                continue
+            if not online:
+                results[mac] = VENDOR_UNKNOWN
+                continue
+            pending.setdefault(VendorCache.key(mac), []).append(mac)
+
+        if pending:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.VENDOR_LOOKUP_WORKERS, len(pending))) as executor:
+                answers = executor.map(self._query_vendor_api, [group[0] for group in pending.values()])
+                for group, vendor in zip(pending.values(), answers):
+                    for mac in group:
+                        results[mac] = vendor
+            self.vendor_cache.save()
+        return results
+
+    def get_vendor(self, mac: str) -> str:
+        """Fetch vendor information from the offline OUI database or cache, falling back to an online API."""
+        return self.get_vendors([mac])[mac]
     
     def is_locally_administered(self, mac: str) -> bool:
         """Check if MAC is locally administered (random)."""
@@ -75,6 +364,11 @@ class MACAddressManager:
     
     def get_current_mac(self, interface: str) -> Optional[str]:
         """Get the current MAC address for a given interface."""
+        if self.platform == 'Linux':
+            mac = read_sysfs_mac(interface)
+            if mac:
+                return mac
+        import subprocess
         try:
             if self.platform == 'Darwin':
                 cmd = ['ifconfig', interface]
@@ -92,8 +386,28 @@ class MACAddressManager:
             return None
         return None
 
+    def list_interface_details(self) -> List[dict]:
+        """
+        List interfaces as dicts with name, mac, operstate and type.
+
+        On Linux this is a single read of sysfs; elsewhere (or without sysfs) it falls
+        back to parsing command output, where operstate is unknown.
+        """
+        if self.platform == 'Linux':
+            details = read_sysfs_interfaces()
+            if details is not None:
+                return details
+        return [{'name': iface, 'mac': mac, 'operstate': 'unknown', 'type': 'ether', 'arphrd': ARPHRD_ETHER}
+                for iface, mac in self._list_interfaces_from_commands()]
+
     def list_interfaces(self) -> List[Tuple[str, str]]:
-        """List all network interfaces with their MAC addresses."""
+        """List all Ethernet-type network interfaces with their MAC addresses."""
+        return [(d['name'], d['mac']) for d in self.list_interface_details()
+                if d['arphrd'] == ARPHRD_ETHER and d['mac']]
+
+    def _list_interfaces_from_commands(self) -> List[Tuple[str, str]]:
+        """List interfaces by parsing `networksetup` (macOS) or `ip link` (Linux) output."""
+        import subprocess
         interfaces = []
         try:
             if self.platform == 'Darwin':
@@ -124,82 +438,408 @@ class MACAddressManager:
             
         return interfaces
     
-    def analyze_mac(self, mac: str):
-        """Analyze a MAC address and display a rich table of information."""
+    @property
+    def stored_macs(self) -> Dict[str, str]:
+        """Named MAC addresses from ENV_FILE, keyed by lower-cased name (with and without '_mac')."""
+        if self._stored_macs is None:
+            self._stored_macs = {}
+            try:
+                with open(self.ENV_FILE, encoding='utf-8') as f:
+                    lines = f.readlines()
+            except OSError:
+                lines = []
+            for line in lines:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                name, value = line.split('=', 1)
+                name = name.strip().removeprefix('export ').strip().lower()
+                is_valid, normalized = self.validate_mac(value.strip().strip('\'"'))
+                if is_valid:
+                    self._stored_macs[name] = normalized
+                    if name.endswith('_mac'):
+                        self._stored_macs.setdefault(name[:-4], normalized)
+        return self._stored_macs
+
+    def set_mac(self, interface: str, mac: str) -> Tuple[bool, str]:
+        """Set an interface's MAC address (runs the platform tool via sudo). Returns (ok, message)."""
+        is_valid, normalized = self.validate_mac(mac)
+        if not is_valid:
+            return False, f"Invalid MAC address: '{mac}'"
+        if self.platform == 'Linux':
+            commands = [['sudo', 'ip', 'link', 'set', 'dev', interface, 'down'],
+                        ['sudo', 'ip', 'link', 'set', 'dev', interface, 'address', normalized],
+                        ['sudo', 'ip', 'link', 'set', 'dev', interface, 'up']]
+        elif self.platform == 'Darwin':
+            commands = [['sudo', 'ifconfig', interface, 'ether', normalized]]
+        else:
+            return False, f"Setting MAC addresses is not supported on {self.platform}"
+        import subprocess
+        for cmd in commands:
+            try:
+                subprocess.run(cmd, capture_output=True, text=True, check=True)
+            except subprocess.CalledProcessError as e:
+                return False, (e.stderr or str(e)).strip()
+            except FileNotFoundError as e:
+                return False, str(e)
+        return True, f"MAC for {interface} set to {normalized}"
+
+    def read_neighbors(self) -> List[dict]:
+        """
+        Read the kernel neighbor (ARP) table in one pass as dicts with ip, mac and device.
+
+        Linux reads /proc/net/arp directly; macOS (or Linux without procfs) parses `arp -an`.
+        Incomplete entries are skipped.
+        """
+        neighbors = []
+        try:
+            with open(PROC_NET_ARP) as f:
+                next(f, None)  # header
+                for line in f:
+                    parts = line.split()
+                    if len(parts) < 6 or not int(parts[2], 16) & _ATF_COM:
+                        continue
+                    is_valid, mac = self.validate_mac(parts[3])
+                    if is_valid and mac != '00:00:00:00:00:00':
+                        neighbors.append({'ip': parts[0], 'mac': mac, 'device': parts[5]})
+            return neighbors
+        except OSError:
+            pass
+
+        import subprocess
+        try:
+            result = subprocess.run(['arp', '-an'], capture_output=True, text=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return neighbors
+        # "? (192.168.1.1) at 0:1b:63:a:b:c on en0 ifscope [ethernet]"
+        for match in re.finditer(r'\((?P<ip>[^)]+)\) at (?P<mac>[0-9a-fA-F:]+) on (?P<dev>\S+)', result.stdout):
+            octets = match.group('mac').split(':')
+            if len(octets) != 6:
+                continue
+            mac = ':'.join(octet.zfill(2) for octet in octets).lower()
+            neighbors.append({'ip': match.group('ip'), 'mac': mac, 'device': match.group('dev')})
+        return neighbors
+
+    def inventory(self, snapshot_path: str = DEFAULT_INVENTORY_SNAPSHOT, online: bool = False) -> dict:
+        """
+        Scan the neighbor table, enrich it, and compare it with the last saved snapshot.
+
+        Vendors are resolved for all entries in one get_vendors batch, from the offline OUI
+        database and cache only unless online is set: a large neighbor table would otherwise
+        mean a slow, rate-limited scan that sends every neighbor's MAC to the API.
+        The new snapshot is written back, and the result has 'current' (all entries, keyed
+        by ip), 'added', 'removed' and 'changed' (ip seen with a different MAC) lists.
+        """
+        import json
+
+        try:
+            with open(snapshot_path, encoding='utf-8') as f:
+                previous = json.load(f).get('neighbors', {})
+        except (OSError, ValueError, AttributeError):
+            previous = {}
+
+        neighbors = self.read_neighbors()
+        vendors = self.get_vendors((n['mac'] for n in neighbors), online=online)
+        now = time.time()
+        current = {}
+        for n in neighbors:
+            old = previous.get(n['ip'])
+            same_host = old is not None and old.get('mac') == n['mac']
+            current[n['ip']] = {
+                'mac': n['mac'],
+                'device': n['device'],
+                'vendor': vendors[n['mac']],
+                'locally_administered': self.is_locally_administered(n['mac']),
+                'multicast': self.is_multicast(n['mac']),
+                'first_seen': old.get('first_seen', now) if same_host else now,
+                'last_seen': now,
+            }
+
+        added = [ip for ip in current if ip not in previous]
+        removed = [ip for ip in previous if ip not in current]
+        changed = [ip for ip in current if ip in previous and previous[ip].get('mac') != current[ip]['mac']]
+
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            tmp_path = f"{snapshot_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'time': now, 'neighbors': current}, f)
+            os.replace(tmp_path, snapshot_path)
+        except OSError:
+            pass
+
+        return {'current': current, 'previous': previous, 'first_run': not previous,
+                'added': added, 'removed': removed, 'changed': changed}
+
+    def analyze_mac(self, mac: str) -> dict:
+        """Analyze a MAC address and return its vendor and address type flags."""
         is_valid, normalized = self.validate_mac(mac)
         if not is_valid:
-            console.print(f"[bold red]Error:[/] Invalid MAC address format: '{mac}'")
-            return
+            return {'valid': False, 'error': f"Invalid MAC address format: '{mac}'"}
 
-        vendor = self.get_vendor(normalized)
         is_local = self.is_locally_administered(normalized)
-        
-        table = Table(title=f"Analysis for [cyan]{normalized}[/]", show_header=False, box=None)
-        table.add_column(style="magenta")
-        table.add_column(style="green")
-        
-        table.add_row("Vendor:", vendor)
-        table.add_row("Type:", "Locally Administered (Random)" if is_local else "Universally Unique (Manufacturer)")
-        table.add_row("Transmission:", "Multicast/Broadcast" if self.is_multicast(normalized) else "Unicast")
-        
-        console.print(table)
+        return {
+            'valid': True,
+            'mac': normalized,
+            'vendor': self.get_vendor(normalized),
+            'locally_administered': is_local,
+            'multicast': self.is_multicast(normalized),
+            'type': 'Locally Administered (Random)' if is_local else 'Universally Unique (Manufacturer)',
+        }
+
+
+# Every MAC notation seen in DHCP leases, ARP dumps and switch CAM tables, in one
+# pass: aa:bb:cc:dd:ee:ff / aa-bb-cc-dd-ee-ff (BSD arp drops leading zeros, 0:1b:63:a:b:c),
+# Cisco aabb.ccdd.eeff, and bare aabbccddeeff. Bare matches without a letter a-f are plain
+# 12-digit numbers (IDs, timestamps) and are skipped by the caller; checking that in the
+# pattern would cost a lookahead at every digit.
+_MAC_IN_TEXT_RE = re.compile(
+    r'(?<![0-9A-Fa-f:-])(?:'
+    r'[0-9A-Fa-f]{1,2}([:-])[0-9A-Fa-f]{1,2}(?:\1[0-9A-Fa-f]{1,2}){4}'
+    r'|[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}\.[0-9A-Fa-f]{4}'
+    r'|[0-9A-Fa-f]{12}'
+    r')(?![0-9A-Fa-f:-])'
+)
+_MAC_SEPARATORS = str.maketrans('', '', ':-.')
 
+BULK_FIELDS = ['mac', 'vendor', 'locally_administered', 'multicast', 'source', 'line']
 
-def run_command(manager: MACAddressManager, args: argparse.Namespace):
-    """Execute a command based on parsed arguments."""
+
+def iter_bulk_records(manager: MACAddressManager, sources: List[str]) -> Iterator[tuple]:
+    """
+    Stream every MAC address found in the given files ('-' for stdin) as a record
+    tuple, in BULK_FIELDS order.
+
+    Lines are read lazily and vendors come from the offline OUI database only
+    (memoized per 36-bit prefix), so memory stays constant however long the input is.
+    """
+    @functools.lru_cache(maxsize=65536)
+    def vendor_for_prefix(p: str) -> str:
+        # Same colon form analyze uses; the KNOWN_VENDORS fallback keys on 'xx:xx:xx'.
+        return manager.get_offline_vendor(f'{p[0:2]}:{p[2:4]}:{p[4:6]}:{p[6:8]}:{p[8]}0:00') or ''
+
+    for source in sources or ['-']:
+        if source == '-':
+            stream, name = sys.stdin, '<stdin>'
+        else:
+            stream, name = open(source, encoding='utf-8', errors='replace'), source
+        try:
+            for lineno, line in enumerate(stream, 1):
+                for match in _MAC_IN_TEXT_RE.finditer(line):
+                    text, sep = match.group(0), match.group(1)
+                    if sep is None and text.isdigit():
+                        continue
+                    if sep and len(text) != 17:
+                        c = ''.join(octet.zfill(2) for octet in text.split(sep)).lower()
+                    else:
+                        c = text.translate(_MAC_SEPARATORS).lower()
+                    first_octet = int(c[:2], 16)
+                    # Like get_vendors: a known prefix wins even if it is locally
+                    # administered (QEMU's 52:54:00).
+                    yield (f'{c[0:2]}:{c[2:4]}:{c[4:6]}:{c[6:8]}:{c[8:10]}:{c[10:12]}',
+                           vendor_for_prefix(c[:9]),
+                           bool(first_octet & 0x02), bool(first_octet & 0x01), name, lineno)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def run_bulk(manager: MACAddressManager, sources: List[str], output_format: str = 'jsonl') -> int:
+    """Write bulk analysis records to stdout as JSON lines or CSV. Returns the record count."""
+    out = sys.stdout
+    count = 0
+    if output_format == 'csv':
+        import csv
+        writer = csv.writer(out, lineterminator='\n')
+        writer.writerow(BULK_FIELDS)
+        for record in iter_bulk_records(manager, sources):
+            writer.writerow(record)
+            count += 1
+    else:
+        # Vendors and source names repeat constantly, so JSON-encode each one once.
+        import json
+        encode = functools.lru_cache(maxsize=65536)(json.dumps)
+        flags = {True: 'true', False: 'false'}
+        for mac, vendor, local, multicast, source, line in iter_bulk_records(manager, sources):
+            out.write(f'{{"mac":"{mac}","vendor":{encode(vendor)},"locally_administered":{flags[local]},'
+                      f'"multicast":{flags[multicast]},"source":{encode(source)},"line":{line}}}\n')
+            count += 1
+    out.flush()
+    return count
+
+
+def run_command(manager: MACAddressManager, args: argparse.Namespace) -> int:
+    """Execute a command based on parsed arguments. Returns the exit status."""
     command = getattr(args, 'command', None)
+    plain = getattr(args, 'plain', False)
+    # The shell helpers parse the wording of the original linux/python_helpers script.
+    legacy = plain and getattr(args, 'legacy_output', False)
     if command == 'validate':
         is_valid, normalized = manager.validate_mac(args.mac)
-        if is_valid:
-            console.print(f"[green]✓[/] Valid MAC address: [cyan]{normalized}[/]")
+        if plain:
+            if is_valid:
+                print(f"✓ Valid MAC address: {normalized}")
+            elif legacy:
+                print("✗ Invalid MAC address", file=sys.stderr)
+            else:
+                print(f"✗ Invalid MAC address: {args.mac}", file=sys.stderr)
+        elif is_valid:
+            get_console().print(f"[green]✓[/] Valid MAC address: [cyan]{normalized}[/]")
         else:
-            console.print(f"[red]✗[/] Invalid MAC address: [yellow]{args.mac}[/]")
+            get_console().print(f"[red]✗[/] Invalid MAC address: [yellow]{args.mac}[/]")
+        return 0 if is_valid else 1
             
     elif command == 'generate':
         mac = manager.generate_random_mac(getattr(args, 'locally_administered', True))
-        console.print(f"Generated MAC: [bold cyan]{mac}[/]")
+        if plain:
+            print(mac)
+        else:
+            get_console().print(f"Generated MAC: [bold cyan]{mac}[/]")
         
     elif command == 'analyze':
-        manager.analyze_mac(args.mac)
+        info = manager.analyze_mac(args.mac)
+        if not info['valid']:
+            if legacy:
+                print("Invalid MAC address format", file=sys.stderr)
+            elif plain:
+                print(f"Error: {info['error']}", file=sys.stderr)
+            else:
+                get_console().print(f"[bold red]Error:[/] {info['error']}")
+            return 1
+        transmission = "Multicast/Broadcast" if info['multicast'] else "Unicast"
+        if legacy:
+            vendor = VENDOR_UNKNOWN if info['vendor'] == VENDOR_LOCAL else info['vendor']
+            print(f"MAC Address: {info['mac']}")
+            print(f"Vendor: {vendor}")
+            print(f"Type: {'Random/Custom' if info['locally_administered'] else 'Manufacturer Assigned'}")
+            print(f"Locally Administered: {'Yes' if info['locally_administered'] else 'No'}")
+            print(f"Multicast: {'Yes' if info['multicast'] else 'No'}")
+        elif plain:
+            print(f"MAC Address: {info['mac']}")
+            print(f"Vendor: {info['vendor']}")
+            print(f"Type: {info['type']}")
+            print(f"Transmission: {transmission}")
+        else:
+            from rich.table import Table
+            table = Table(title=f"Analysis for [cyan]{info['mac']}[/]", show_header=False, box=None)
+            table.add_column(style="magenta")
+            table.add_column(style="green")
+            table.add_row("Vendor:", info['vendor'])
+            table.add_row("Type:", info['type'])
+            table.add_row("Transmission:", transmission)
+            get_console().print(table)
             
     elif command == 'list':
-        interfaces = manager.list_interfaces()
+        interfaces = [d for d in manager.list_interface_details()
+                      if d['arphrd'] == ARPHRD_ETHER and d['mac']]
+        vendors = manager.get_vendors(d['mac'] for d in interfaces)
+        if plain:
+            print("Network Interfaces:")
+            for d in interfaces:
+                print(f"  {d['name']:12} {d['mac']:17} {d['operstate']:8} {d['type']:9} ({vendors[d['mac']]})")
+            return 0
+
+        from rich.table import Table
         table = Table(title="Available Network Interfaces")
         table.add_column("Interface", style="cyan", no_wrap=True)
         table.add_column("MAC Address", style="magenta")
+        table.add_column("State", style="yellow")
+        table.add_column("Type", style="blue")
         table.add_column("Vendor", style="green")
-        
-        for iface, mac in interfaces:
-            vendor = manager.get_vendor(mac)
-            table.add_row(iface, mac, vendor)
-        console.print(table)
+        for d in interfaces:
+            table.add_row(d['name'], d['mac'], d['operstate'], d['type'], vendors[d['mac']])
+        get_console().print(table)
             
     elif command == 'get':
         mac = manager.get_current_mac(args.interface)
         if mac:
-            console.print(f"MAC for {args.interface}: [bold cyan]{mac}[/]")
+            if plain:
+                print(mac)
+            else:
+                get_console().print(f"MAC for {args.interface}: [bold cyan]{mac}[/]")
         else:
-            console.print(f"[red]Error:[/] Could not get MAC for interface '{args.interface}'")
+            if plain:
+                print(f"Error: Could not get MAC for {args.interface}", file=sys.stderr)
+            else:
+                get_console().print(f"[red]Error:[/] Could not get MAC for interface '{args.interface}'")
+            return 1
 
     elif command == 'set':
         mac_to_set = manager.stored_macs.get(args.mac.lower(), args.mac)
-        manager.set_mac(args.interface, mac_to_set)
+        ok, message = manager.set_mac(args.interface, mac_to_set)
+        if plain:
+            print(message if ok else f"Error: {message}", file=sys.stdout if ok else sys.stderr)
+        else:
+            get_console().print(f"[green]✓[/] {message}" if ok else f"[red]Error:[/] {message}")
+        return 0 if ok else 1
 
     elif command == 'show':
+        if plain:
+            for name, mac in manager.stored_macs.items():
+                print(f"{name:20} {mac}")
+            return 0
+        from rich.table import Table
         table = Table(title="Stored MAC Addresses")
         table.add_column("Name", style="cyan")
         table.add_column("MAC Address", style="magenta")
         for name, mac in manager.stored_macs.items():
             table.add_row(name, mac)
-        console.print(table)
+        get_console().print(table)
+
+    elif command == 'inventory':
+        result = manager.inventory(getattr(args, 'snapshot', None) or DEFAULT_INVENTORY_SNAPSHOT,
+                                   online=bool(getattr(args, 'online', False)))
+        current, previous = result['current'], result['previous']
+        rows = [('+', ip, current[ip]) for ip in result['added']]
+        rows += [('~', ip, current[ip]) for ip in result['changed']]
+        rows += [('-', ip, previous[ip]) for ip in result['removed']]
+        if getattr(args, 'all', False):
+            reported = set(result['added']) | set(result['changed'])
+            rows += [(' ', ip, entry) for ip, entry in current.items() if ip not in reported]
+
+        def flags(entry: dict) -> str:
+            return ','.join(name for name, on in (('local', entry.get('locally_administered')),
+                                                  ('multicast', entry.get('multicast'))) if on)
+
+        summary = (f"{len(current)} neighbor(s): {len(result['added'])} new, "
+                   f"{len(result['changed'])} changed, {len(result['removed'])} gone")
+        if result['first_run']:
+            summary += " (first scan, snapshot saved)"
+        if plain:
+            for mark, ip, entry in rows:
+                print(f"{mark} {ip:39} {entry['mac']:17} {entry.get('device', ''):10} "
+                      f"{flags(entry):16} {entry.get('vendor', '')}")
+            print(summary)
+            return 0
+
+        from rich.table import Table
+        styles = {'+': 'green', '~': 'yellow', '-': 'red', ' ': ''}
+        table = Table(title="Neighbor Inventory")
+        table.add_column("", no_wrap=True)
+        table.add_column("IP Address", style="cyan", no_wrap=True)
+        table.add_column("MAC Address", style="magenta")
+        table.add_column("Device", style="blue")
+        table.add_column("Flags", style="yellow")
+        table.add_column("Vendor", style="green")
+        for mark, ip, entry in rows:
+            table.add_row(mark, ip, entry['mac'], entry.get('device', ''), flags(entry),
+                          entry.get('vendor', ''), style=styles[mark])
+        console = get_console()
+        if rows:
+            console.print(table)
+        console.print(summary)
 
     elif command in ['help', 'h']:
         print_interactive_help()
     else:
-        console.print(f"[bold red]Unknown command:[/] '{command}'. Type 'help' for a list of commands.")
+        get_console().print(f"[bold red]Unknown command:[/] '{command}'. Type 'help' for a list of commands.")
+        return 1
+    return 0
 
 def print_interactive_help():
     """Prints the help message for interactive mode."""
+    from rich.panel import Panel
+    from rich.text import Text
     panel = Panel(
         Text.from_markup(
             """
@@ -211,6 +851,7 @@ def print_interactive_help():
   [cyan]analyze[/cyan] [yellow]<mac_address>[/yellow]       - Analyze a MAC address.
   [cyan]validate[/cyan] [yellow]<mac_address>[/yellow]      - Validate a MAC address format.
   [cyan]generate[/cyan] [yellow](--universal)[/yellow]    - Generate a new random MAC address.
+  [cyan]inventory[/cyan] [yellow](--all --online)[/yellow]  - Show neighbor table changes since the last scan.
   [cyan]help[/cyan]                            - Show this help message.
   [cyan]exit[/cyan], [cyan]quit[/cyan], [cyan]/q[/cyan]                  - Exit the interactive shell.
             """
@@ -218,10 +859,12 @@ def print_interactive_help():
         title="[bold green]Interactive Help[/]",
         border_style="blue"
     )
-    console.print(panel)
+    get_console().print(panel)
 
 def interactive_mode(manager: MACAddressManager):
     """Run the tool in interactive mode."""
+    from rich.panel import Panel
+    console = get_console()
     console.print(Panel("Welcome to the [bold green]Interactive MAC Manager[/]! Type 'help' for commands.",
                         expand=False, border_style="blue"))
     while True:
@@ -250,6 +893,9 @@ def interactive_mode(manager: MACAddressManager):
                     args_dict['interface'] = parts[1]
                 elif command == 'generate' and '--universal' in parts:
                     args_dict['locally_administered'] = False
+                elif command == 'inventory':
+                    args_dict['all'] = '--all' in parts
+                    args_dict['online'] = '--online' in parts
             
             # Convert dict to Namespace to reuse the run_command function
             run_command(manager, argparse.Namespace(**args_dict))
@@ -260,12 +906,12 @@ def interactive_mode(manager: MACAddressManager):
         except Exception as e:
             console.print(f"[bold red]An unexpected error occurred:[/] {e}")
 
-def main():
+def main(default_plain: bool = False):
     parser = argparse.ArgumentParser(
         description='Advanced MAC Address Manager.',
         formatter_class=argparse.RawTextHelpFormatter
     )
-    parser.add_argument('command', nargs='?', choices=['validate', 'generate', 'analyze', 'list', 'get', 'set', 'show', 'interactive'],
+    parser.add_argument('command', nargs='?', choices=['validate', 'generate', 'analyze', 'list', 'get', 'set', 'show', 'bulk', 'inventory', 'interactive'],
                        default='interactive',
                        help='''Command to execute:
   validate      - Validate a MAC address format.
@@ -275,32 +921,70 @@ def main():
   get           - Get the MAC for a specific interface.
   set           - Set the MAC for a specific interface (requires sudo).
   show          - Show stored MAC addresses from .env file.
+  bulk          - Extract and analyze every MAC in files (or stdin), e.g. DHCP
+                  leases, ARP dumps or CAM tables, as JSON lines or CSV.
+  inventory     - Scan the neighbor (ARP) table and report hosts that are new,
+                  changed or gone since the last scan.
   interactive   - (Default) Enter interactive mode.''')
     parser.add_argument('params', nargs='*', help='Parameters for the command (e.g., interface, mac address)')
+    parser.add_argument('--mac', help='MAC address (alternative to the positional parameter)')
+    parser.add_argument('--interface', help='Network interface (alternative to the positional parameter)')
     parser.add_argument('--locally-administered', action='store_true',
                        help='Generate a locally administered MAC (for "generate")')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl',
+                       help='Output format for "bulk" (default: jsonl)')
+    parser.add_argument('--all', action='store_true',
+                       help='For "inventory", list unchanged neighbors too')
+    parser.add_argument('--snapshot', metavar='PATH',
+                       help=f'Snapshot file for "inventory" (default: {DEFAULT_INVENTORY_SNAPSHOT})')
+    parser.add_argument('--plain', action='store_true', default=None,
+                       help='Plain-text output without rich (also MAC_MANAGER_PLAIN=1)')
+    parser.add_argument('--online', action='store_true', default=None,
+                       help='Query the online vendor API for OUIs missing from the offline database\n'
+                            '(default for analyze/list; "inventory" stays offline without it)')
+    parser.add_argument('--offline', dest='online', action='store_false',
+                       help='Use only the offline OUI database and cache for vendors')
 
-    args = parser.parse_args()
+    args = parser.parse_intermixed_args()
+    args.legacy_output = default_plain
+    if args.plain is None:
+        args.plain = default_plain or os.environ.get('MAC_MANAGER_PLAIN', '') not in ('', '0')
+    if not args.plain and args.command != 'bulk' and not rich_available():
+        # Still usable from scripts on hosts without rich.
+        args.plain = True
     
     # This block is a bit of a hack to make the CLI feel more natural
     # by not using flags like --mac and --interface for the main params.
     if args.command in ['validate', 'analyze']:
-        if not args.params: parser.error("A MAC address is required.")
-        args.mac = args.params[0]
+        if not args.mac and not args.params: parser.error("A MAC address is required.")
+        args.mac = args.mac or args.params[0]
     if args.command == 'get':
-        if not args.params: parser.error("An interface is required.")
-        args.interface = args.params[0]
+        if not args.interface and not args.params: parser.error("An interface is required.")
+        args.interface = args.interface or args.params[0]
     if args.command == 'set':
-        if len(args.params) < 2: parser.error("An interface and a MAC address (or name) are required.")
-        args.interface = args.params[0]
-        args.mac = args.params[1]
+        params = ([args.interface] if args.interface else []) + args.params + ([args.mac] if args.mac else [])
+        if len(params) < 2: parser.error("An interface and a MAC address (or name) are required.")
+        args.interface, args.mac = params[0], params[1]
 
-    manager = MACAddressManager()
+    # The shell helpers stay offline unless asked; the full tool looks vendors up online.
+    online = args.online if args.online is not None else not default_plain
+    manager = MACAddressManager(online=online)
 
     if args.command == 'interactive':
+        if args.plain:
+            parser.error("interactive mode needs the 'rich' library (pip install rich)")
         interactive_mode(manager)
+    elif args.command == 'bulk':
+        try:
+            run_bulk(manager, args.params, args.format)
+        except BrokenPipeError:
+            # Output piped into head(1) or similar; not an error.
+            sys.stderr.close()
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
     else:
-        run_command(manager, args)
+        sys.exit(run_command(manager, args))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for mac_manager.py
+Runs the CLI as the shell helpers do (one process per call) and reports wall time per
+command, next to a bare interpreter start for reference.
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from typing import List
+
+MAC_MANAGER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mac_manager.py')
+
+# Commands the shell aliases run most often; none of them touch the network.
+COMMANDS = [
+    ('python -c pass', ['-c', 'pass']),
+    ('validate --plain', [MAC_MANAGER, 'validate', '00:11:22:33:44:55', '--plain']),
+    ('generate --plain', [MAC_MANAGER, 'generate', '--plain']),
+    ('validate (rich)', [MAC_MANAGER, 'validate', '00:11:22:33:44:55']),
+    ('get --plain', [MAC_MANAGER, 'get', 'lo', '--plain']),
+]
+
+
+def time_command(argv: List[str], runs: int) -> List[float]:
+    """Run `python argv` `runs` times and return the wall times in milliseconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def slowest_imports(argv: List[str], count: int) -> List[str]:
+    """Return the `count` most expensive imports (cumulative) reported by -X importtime."""
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + argv,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return [f"{us / 1000:8.1f} ms  {name}" for us, name in rows[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure mac_manager.py CLI startup time.')
+    parser.add_argument('--runs', type=int, default=20, help='Runs per command (default: 20)')
+    parser.add_argument('--imports', type=int, default=0, metavar='N',
+                        help='Also show the N slowest imports for "validate --plain"')
+    args = parser.parse_args()
+
+    # Warm the page cache so the first command isn't penalized.
+    time_command(COMMANDS[1][1], 2)
+
+    print(f"{'command':20} {'min':>8} {'median':>8} {'mean':>8}   (ms, {args.runs} runs)")
+    for label, argv in COMMANDS:
+        timings = time_command(argv, args.runs)
+        print(f"{label:20} {min(timings):8.1f} {statistics.median(timings):8.1f} "
+              f"{statistics.mean(timings):8.1f}")
+
+    if args.imports:
+        print("\nSlowest imports for 'validate --plain':")
+        for row in slowest_imports(COMMANDS[1][1], args.imports):
+            print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,28 +3,660 @@
 A script to organize files in a directory by their extension.
 """
 import os
+import re
+import sys
+import json
+import mmap
+import errno
+import fcntl
+import time
+import queue
+import ctypes
+import ctypes.util
+import select
+import struct
+import hashlib
 import shutil
+import fnmatch
 import argparse
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
-def organize_directory(directory: str, dry_run: bool = False):
+# Moves are I/O bound (especially on network mounts), so use more threads than cores,
+# but keep the pool bounded so we don't flood the filesystem with requests.
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# How often (in files) to print a progress line while moving.
+PROGRESS_INTERVAL = 1000
+
+# Capacity of each queue between the stages of the recursive pipeline. This is what
+# keeps memory flat: the walker blocks once the movers fall this far behind.
+DEFAULT_QUEUE_SIZE = 1024
+
+# Marks the end of a stage's output in the recursive pipeline.
+_DONE = object()
+
+# Duplicate detection reads this much from the head and the tail of each candidate
+# before committing to a full hash.
+PARTIAL_HASH_BLOCK = 64 * 1024
+
+# Full hashes use mmap above this size and large buffered reads below it.
+MMAP_THRESHOLD = 8 * 1024 * 1024
+HASH_BUFFER_SIZE = 1024 * 1024
+
+DEDUPE_ACTIONS = ("report", "link", "remove")
+
+# Names like "foo (1).pdf", "foo copy.pdf" or "foo - Copy.pdf" are the ones to drop
+# when choosing which file of a duplicate group to keep.
+_COPY_SUFFIX_RE = re.compile(r"(?: \(\d+\)| copy(?: \d+)?| - copy(?: \(\d+\))?)$", re.IGNORECASE)
+
+# Content sniffing reads only this many bytes from the start of each file. It has
+# to reach the 'ustar' marker of tar archives at offset 257.
+SNIFF_BYTES = 512
+
+# Header reads are handed to the thread pool in batches of this many files.
+SNIFF_BATCH_SIZE = 64
+
+# (type, offset, magic bytes). Earlier entries win, so specific signatures come
+# before the generic ones they share a prefix with.
+MAGIC_SIGNATURES = [
+    ("pdf", 0, b"%PDF-"),
+    ("png", 0, b"\x89PNG\r\n\x1a\n"),
+    ("jpg", 0, b"\xff\xd8\xff"),
+    ("gif", 0, b"GIF87a"),
+    ("gif", 0, b"GIF89a"),
+    ("webp", 0, b"RIFF....WEBP"),
+    ("wav", 0, b"RIFF....WAVE"),
+    ("avi", 0, b"RIFF....AVI "),
+    ("tiff", 0, b"II*\x00"),
+    ("tiff", 0, b"MM\x00*"),
+    ("psd", 0, b"8BPS"),
+    ("heic", 4, b"ftypheic"),
+    ("mov", 4, b"ftypqt  "),
+    ("m4a", 4, b"ftypM4A "),
+    ("mp4", 4, b"ftyp"),
+    ("mkv", 0, b"\x1a\x45\xdf\xa3"),
+    ("mp3", 0, b"ID3"),
+    ("flac", 0, b"fLaC"),
+    ("ogg", 0, b"OggS"),
+    ("zip", 0, b"PK\x03\x04"),
+    ("zip", 0, b"PK\x05\x06"),
+    ("gz", 0, b"\x1f\x8b"),
+    ("bz2", 0, b"BZh"),
+    ("xz", 0, b"\xfd7zXZ\x00"),
+    ("7z", 0, b"7z\xbc\xaf\x27\x1c"),
+    ("rar", 0, b"Rar!\x1a\x07"),
+    ("tar", 257, b"ustar"),
+    ("deb", 0, b"!<arch>\ndebian"),
+    ("rpm", 0, b"\xed\xab\xee\xdb"),
+    ("doc", 0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),
+    ("rtf", 0, b"{\\rtf1"),
+    ("sqlite", 0, b"SQLite format 3\x00"),
+    ("exe", 0, b"MZ"),
+    ("elf", 0, b"\x7fELF"),
+    ("woff", 0, b"wOFF"),
+    ("woff2", 0, b"wOF2"),
+    ("ps", 0, b"%!PS"),
+    ("xml", 0, b"<?xml"),
+]
+
+# Extensions that are legitimately stored in a sniffed container format. A file
+# keeps its own extension when it is one of these, e.g. a .docx is a zip file.
+SNIFF_COMPATIBLE = {
+    "zip": {"docx", "xlsx", "pptx", "odt", "ods", "odp", "odg", "jar", "apk", "epub",
+            "whl", "xpi", "ipa", "kmz", "3mf", "vsix", "nupkg"},
+    "doc": {"xls", "ppt", "msi", "msg", "vsd"},
+    "jpg": {"jpeg", "jpe", "jfif"},
+    "tiff": {"tif", "dng", "cr2", "nef", "arw"},
+    "mp4": {"m4v", "m4a", "m4b", "mov", "3gp", "3g2", "heif", "avif"},
+    "mkv": {"webm", "mka", "mk3d"},
+    "ogg": {"oga", "ogv", "opus", "spx"},
+    "gz": {"tgz"},
+    "exe": {"dll", "sys", "scr", "cpl", "ocx", "efi"},
+    "elf": {"so", "o", "bin", "run", "appimage"},
+    "xml": {"svg", "plist", "xsd", "xsl", "xslt", "rss", "atom", "kml", "gpx", "xaml",
+            "csproj", "resx", "drawio"},
+    "ps": {"eps"},
+}
+
+
+def _compile_signatures(signatures):
+    """Fold the signature table into one anchored regex with a named group per entry."""
+    alternatives = []
+    group_types = {}
+    for index, (kind, offset, magic) in enumerate(signatures):
+        group = f"sig{index}"
+        group_types[group] = kind
+        # '.' in a magic is a wildcard byte (e.g. the RIFF chunk size).
+        pattern = b".".join(re.escape(part) for part in magic.split(b"."))
+        alternatives.append(b"(?P<%s>.{%d}%s)" % (group.encode(), offset, pattern))
+    return re.compile(b"|".join(alternatives), re.DOTALL), group_types
+
+
+_MAGIC_RE, _MAGIC_GROUP_TYPES = _compile_signatures(MAGIC_SIGNATURES)
+
+# Watch mode waits this long after the last event for a file before moving it, so
+# files that are still being written (or re-opened by the writer) settle first.
+DEFAULT_DEBOUNCE = 0.5
+
+# In-progress downloads and temporary files that watch mode never touches; the
+# final file shows up as a separate moved-to event once the download finishes.
+WATCH_IGNORED_SUFFIXES = (".part", ".partial", ".crdownload", ".download", ".tmp",
+                          ".opdownload", ".!qb", ".organize-link-tmp")
+
+# inotify(7) constants.
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# Every move is appended to this file in the organized directory so a run can be
+# undone with --undo. It is a dotfile, so scans and watch mode skip it.
+JOURNAL_NAME = ".organize-journal.jsonl"
+
+# The journal is fsync'ed every this many records (and when a run ends), so a crash
+# can lose at most this many entries while keeping per-move overhead low.
+JOURNAL_SYNC_INTERVAL = 256
+
+# FICLONE ioctl from linux/fs.h: share extents with the source (reflink) instead of copying.
+_FICLONE = 0x40049409
+
+
+def _classify(name: str, header: Optional[bytes] = None) -> Optional[str]:
+    """
+    Return the folder name for a file: its lower-cased extension (without the dot), or None.
+
+    When a header is given and matches a known signature, the sniffed type wins over
+    a missing or mismatched extension, unless the extension is a compatible
+    specialisation of it (see SNIFF_COMPATIBLE).
+    """
+    _, extension = os.path.splitext(name)
+    ext = extension[1:].lower() if extension else None
+    if not header:
+        return ext
+    match = _MAGIC_RE.match(header)
+    if not match:
+        return ext
+    kind = _MAGIC_GROUP_TYPES[match.lastgroup]
+    if ext and (ext == kind or ext in SNIFF_COMPATIBLE.get(kind, ())):
+        return ext
+    return kind
+
+
+def _read_header(path: str) -> Optional[bytes]:
+    """Read the first SNIFF_BYTES of a file, or None if it cannot be read."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, SNIFF_BYTES)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _read_headers(paths: List[str]) -> List[Optional[bytes]]:
+    """Read the headers of a batch of files (one thread pool task)."""
+    return [_read_header(path) for path in paths]
+
+
+def _sniff_batch(executor: ThreadPoolExecutor, items: List[Tuple[str, str]]) -> List[Optional[str]]:
+    """Classify (path, name) items by content, reading their headers in parallel batches."""
+    paths = [path for path, _ in items]
+    batches = [paths[i:i + SNIFF_BATCH_SIZE] for i in range(0, len(paths), SNIFF_BATCH_SIZE)]
+    headers = [header for batch in executor.map(_read_headers, batches) for header in batch]
+    return [_classify(name, header) for (_, name), header in zip(items, headers)]
+
+
+def _scan_directory(directory: str, sniff: bool = False,
+                    workers: int = DEFAULT_WORKERS) -> Dict[str, List[str]]:
+    """
+    Group the regular files at the top level of a directory by extension.
+
+    Uses os.scandir so the file type comes from the cached DirEntry data instead of
+    an extra stat() call per entry. With sniff, files are classified by their header
+    bytes (falling back to the extension), which also picks up extensionless files.
+    """
+    files_by_extension = defaultdict(list)
+    candidates = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            try:
+                if not entry.is_file() or entry.name == JOURNAL_NAME:
+                    continue
+            except OSError:
+                continue
+            if sniff:
+                candidates.append((entry.path, entry.name))
+                continue
+            ext = _classify(entry.name)
+            if ext:
+                files_by_extension[ext].append(entry.name)
+
+    if candidates:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (_, name), ext in zip(candidates, _sniff_batch(executor, candidates)):
+                if ext:
+                    files_by_extension[ext].append(name)
+    return files_by_extension
+
+
+class MoveJournal:
+    """
+    Append-only JSON-lines log of the moves made by one run, used by --undo.
+
+    Each run gets a 'begin' record followed by one record per completed move.
+    Writes are buffered and fsync'ed every JOURNAL_SYNC_INTERVAL records and on close.
+    """
+
+    def __init__(self, path: str, directory: str):
+        self.path = path
+        self.directory = os.path.abspath(directory)
+        self.run = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0
+        self.moves = 0
+
+    def _write(self, record: dict):
+        self.file.write(json.dumps(record) + "\n")
+        self.unsynced += 1
+        if self.unsynced >= JOURNAL_SYNC_INTERVAL:
+            self._sync()
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+
+    def record(self, src_path: str, dest_path: str):
+        with self.lock:
+            if self.file is None:
+                # Only runs that actually move something show up in the journal.
+                self.file = open(self.path, "a", encoding="utf-8")
+                self._write({"op": "begin", "run": self.run, "directory": self.directory,
+                             "time": time.time()})
+            self._write({"op": "move", "run": self.run, "src": os.path.abspath(src_path),
+                         "dst": os.path.abspath(dest_path)})
+            self.moves += 1
+
+    def sync(self):
+        with self.lock:
+            if self.file is not None and self.unsynced:
+                self._sync()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self._sync()
+                self.file.close()
+                self.file = None
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    """Try to clone src into dst without copying data (btrfs, XFS, ...)."""
+    try:
+        fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+    except OSError:
+        return False
+    return True
+
+
+def _copy_data(src_fd: int, dst_fd: int, size: int, fsrc, fdst):
+    """Copy file data in the kernel with copy_file_range, falling back to large buffered copies."""
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < size:
+                n = os.copy_file_range(src_fd, dst_fd, size - copied)
+                if n == 0:
+                    break
+                copied += n
+            return
+        except OSError as e:
+            # Older kernels refuse copy_file_range across filesystems.
+            if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    fsrc.seek(0)
+    fdst.seek(0)
+    shutil.copyfileobj(fsrc, fdst, HASH_BUFFER_SIZE)
+
+
+def _copy_across_devices(src_path: str, dest_path: str, verify: bool = False):
+    """
+    Copy src to dest on another filesystem, via a temp file that is renamed into place.
+
+    Tries a reflink first, then copy_file_range. The copy is fsync'ed and its size
+    checked (and with verify, its content hash) before it replaces dest.
+    """
+    tmp_path = f"{dest_path}.organize-tmp"
+    try:
+        with open(src_path, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            if not _reflink(fsrc.fileno(), fdst.fileno()):
+                _copy_data(fsrc.fileno(), fdst.fileno(), size, fsrc, fdst)
+            fdst.flush()
+            os.fsync(fdst.fileno())
+        shutil.copystat(src_path, tmp_path)
+        copied = os.path.getsize(tmp_path)
+        if copied != size:
+            raise OSError(errno.EIO, f"size mismatch after copy ({copied} != {size} bytes)")
+        if verify:
+            # _full_hash gives None when it can't read the file; that must not pass as a match.
+            src_digest, copy_digest = _full_hash(src_path)[1], _full_hash(tmp_path)[1]
+            if src_digest is None or copy_digest is None:
+                raise OSError(errno.EIO, "could not read the files to verify the copy")
+            if src_digest != copy_digest:
+                raise OSError(errno.EIO, "content hash mismatch after copy")
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _move_file(src_path: str, dest_path: str, journal: Optional[MoveJournal] = None,
+               verify: bool = False) -> Tuple[str, Optional[str]]:
+    """
+    Move a single file, returning (src_path, error message or None).
+
+    Same-filesystem moves are a single os.rename; across filesystems the file is
+    copied (see _copy_across_devices) and the source removed afterwards.
+    """
+    try:
+        try:
+            os.rename(src_path, dest_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            _copy_across_devices(src_path, dest_path, verify)
+            os.remove(src_path)
+    except OSError as e:
+        return src_path, str(e)
+    if journal:
+        journal.record(src_path, dest_path)
+    return src_path, None
+
+
+def _run_moves(moves: List[Tuple[str, str]], workers: int, journal: Optional[MoveJournal] = None,
+               verify: bool = False) -> Tuple[int, List[Tuple[str, str]]]:
+    """Run moves on a bounded thread pool. Returns (moved count, [(src, error), ...])."""
+    moved = 0
+    errors = []
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_move_file, src, dest, journal, verify) for src, dest in moves]
+        for done, future in enumerate(as_completed(futures), 1):
+            src_path, error = future.result()
+            if error:
+                errors.append((src_path, error))
+            else:
+                moved += 1
+            if done % PROGRESS_INTERVAL == 0:
+                elapsed = time.monotonic() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                print(f"  ... {done}/{len(moves)} files processed ({rate:.0f} files/s)")
+    return moved, errors
+
+
+def _is_excluded(name: str, rel_path: str, excludes: Sequence[str]) -> bool:
+    """Check a name or root-relative path against the --exclude glob patterns."""
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(rel_path, pattern)
+               for pattern in excludes)
+
+
+def _walk_tree(root: str, max_depth: Optional[int], excludes: Sequence[str],
+               skip_dirs: set) -> Iterator[Tuple[str, str]]:
+    """
+    Lazily yield (path, name) for every regular file under root.
+
+    Depth 0 is root itself. Symlinked directories are not followed, and top-level
+    directories named in skip_dirs (the extension folders this run creates) are
+    never descended into. Only the directories still waiting to be visited are
+    kept in memory, never the file list.
+    """
+    stack = [(root, 0)]
+    while stack:
+        current, depth = stack.pop()
+        try:
+            entries = os.scandir(current)
+        except OSError as e:
+            print(f"Warning: cannot read '{current}': {e}", file=sys.stderr)
+            continue
+        with entries:
+            for entry in entries:
+                rel_path = os.path.relpath(entry.path, root)
+                if excludes and _is_excluded(entry.name, rel_path, excludes):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth == 0 and entry.name in skip_dirs:
+                            continue
+                        if max_depth is None or depth < max_depth:
+                            stack.append((entry.path, depth + 1))
+                    elif entry.is_file() and entry.name != JOURNAL_NAME:
+                        yield entry.path, entry.name
+                except OSError:
+                    continue
+
+
+def _claim_destination(dest_path: str) -> str:
+    """
+    Atomically reserve a free destination path, appending ' (n)' on collisions.
+
+    Files from different subdirectories can share a name, so the placeholder is
+    created with O_EXCL; the move then replaces it.
+    """
+    base, ext = os.path.splitext(dest_path)
+    candidate = dest_path
+    n = 1
+    while True:
+        try:
+            fd = os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            os.close(fd)
+            return candidate
+        except FileExistsError:
+            candidate = f"{base} ({n}){ext}"
+            n += 1
+
+
+class _PipelineStats:
+    """Thread-safe counters for the recursive pipeline."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.discovered = 0
+        self.moved = 0
+        self.skipped = 0
+        self.errors = 0
+        self.by_extension = defaultdict(int)
+        self.start = time.monotonic()
+
+    def record_move(self, ext: str):
+        with self.lock:
+            self.moved += 1
+            self.by_extension[ext] += 1
+            if self.moved % PROGRESS_INTERVAL == 0:
+                elapsed = time.monotonic() - self.start
+                rate = self.moved / elapsed if elapsed > 0 else 0.0
+                print(f"  ... {self.moved} files moved, {self.discovered} discovered ({rate:.0f} files/s)")
+
+    def record_error(self, src_path: str, error: str):
+        with self.lock:
+            self.errors += 1
+        print(f"Error moving '{src_path}': {error}")
+
+
+def organize_tree(directory: str, dry_run: bool = False, workers: int = DEFAULT_WORKERS,
+                  max_depth: Optional[int] = None, excludes: Sequence[str] = (),
+                  queue_size: int = DEFAULT_QUEUE_SIZE, sniff: bool = False,
+                  journal: Optional[MoveJournal] = None, verify: bool = False):
+    """
+    Recursively organize every file under a directory into top-level extension folders.
+
+    Runs as a streaming pipeline (discover -> classify -> move) connected by bounded
+    queues, so memory use does not grow with the size of the tree.
+
+    :param directory: The root directory to organize.
+    :param dry_run: If True, print the changes that would be made without actually making them.
+    :param workers: Number of move worker threads.
+    :param max_depth: Maximum directory depth to descend into (None for unlimited, 0 for top level only).
+    :param excludes: Glob patterns matched against names and root-relative paths to skip.
+    :param queue_size: Capacity of each queue between pipeline stages.
+    :param sniff: If True, classify files by their header bytes, falling back to the extension.
+    :param journal: If given, every completed move is recorded in it.
+    :param verify: If True, hash-check files copied across filesystems before removing the source.
+    """
+    print(f"Scanning directory tree: {directory}")
+    if dry_run:
+        print("\n[DRY RUN] The following operations would be performed:")
+
+    stats = _PipelineStats()
+    created_dirs = set()
+    ready_dirs = set()
+    dir_lock = threading.Lock()
+    discovered_q = queue.Queue(maxsize=queue_size)
+    move_q = queue.Queue(maxsize=queue_size)
+
+    def discover():
+        try:
+            for item in _walk_tree(directory, max_depth, excludes, created_dirs):
+                with stats.lock:
+                    stats.discovered += 1
+                discovered_q.put(item)
+        finally:
+            discovered_q.put(_DONE)
+
+    def route(src_path: str, ext: Optional[str]):
+        if not ext:
+            with stats.lock:
+                stats.skipped += 1
+            return
+        ext_dir = os.path.join(directory, ext)
+        if os.path.dirname(src_path) == ext_dir:
+            # Already organized by an earlier run.
+            with stats.lock:
+                stats.skipped += 1
+            return
+        move_q.put((src_path, ext, ext_dir, os.path.basename(src_path)))
+
+    def classify():
+        sniff_pool = ThreadPoolExecutor(max_workers=workers) if sniff else None
+        batch = []
+        try:
+            while True:
+                item = discovered_q.get()
+                if item is not _DONE and not sniff:
+                    route(item[0], _classify(item[1]))
+                    continue
+                if item is not _DONE:
+                    batch.append(item)
+                if batch and (item is _DONE or len(batch) >= SNIFF_BATCH_SIZE * workers):
+                    for (src_path, _), ext in zip(batch, _sniff_batch(sniff_pool, batch)):
+                        route(src_path, ext)
+                    batch = []
+                if item is _DONE:
+                    break
+        finally:
+            if sniff_pool:
+                sniff_pool.shutdown()
+            for _ in range(workers):
+                move_q.put(_DONE)
+
+    def ensure_dir(ext: str, ext_dir: str):
+        if ext in ready_dirs:
+            return
+        with dir_lock:
+            if ext in ready_dirs:
+                return
+            # Register before creating so the walker never descends into it.
+            created_dirs.add(ext)
+            if not os.path.isdir(ext_dir):
+                print(f"Creating directory: {ext_dir}")
+                if not dry_run:
+                    os.makedirs(ext_dir, exist_ok=True)
+            ready_dirs.add(ext)
+
+    def move():
+        while True:
+            item = move_q.get()
+            if item is _DONE:
+                break
+            src_path, ext, ext_dir, name = item
+            try:
+                ensure_dir(ext, ext_dir)
+            except OSError as e:
+                stats.record_error(src_path, str(e))
+                continue
+            dest_path = os.path.join(ext_dir, name)
+            if dry_run:
+                print(f"Moving '{src_path}' to '{dest_path}'")
+                stats.record_move(ext)
+                continue
+            try:
+                dest_path = _claim_destination(dest_path)
+            except OSError as e:
+                stats.record_error(src_path, str(e))
+                continue
+            _, error = _move_file(src_path, dest_path, journal, verify)
+            if error:
+                try:
+                    os.remove(dest_path)
+                except OSError:
+                    pass
+                stats.record_error(src_path, error)
+            else:
+                stats.record_move(ext)
+
+    threads = [threading.Thread(target=discover, name="organize-discover", daemon=True),
+               threading.Thread(target=classify, name="organize-classify", daemon=True)]
+    threads += [threading.Thread(target=move, name=f"organize-move-{i}", daemon=True)
+                for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - stats.start
+    rate = stats.moved / elapsed if elapsed > 0 else 0.0
+    verb = "Would move" if dry_run else "Moved"
+    print("\nSummary:")
+    print(f"  Discovered {stats.discovered} file(s), skipped {stats.skipped} without an extension or already organized")
+    print(f"  {verb} {stats.moved} file(s) into {len(stats.by_extension)} folder(s) "
+          f"in {elapsed:.2f}s ({rate:.0f} files/s)")
+    for ext, count in sorted(stats.by_extension.items(), key=lambda kv: -kv[1]):
+        print(f"    - .{ext}: {count} file(s)")
+    if stats.errors:
+        print(f"  Failed: {stats.errors} file(s)")
+
+    print("\nOrganization complete.")
+
+
+def organize_directory(directory: str, dry_run: bool = False, workers: int = DEFAULT_WORKERS,
+                       sniff: bool = False, journal: Optional[MoveJournal] = None,
+                       verify: bool = False):
     """
     Organizes files in a directory by creating subdirectories for each file extension
     and moving the files into them.
 
     :param directory: The directory to organize.
     :param dry_run: If True, print the changes that would be made without actually making them.
+    :param workers: Maximum number of concurrent move operations.
+    :param sniff: If True, classify files by their header bytes, falling back to the extension.
+    :param journal: If given, every completed move is recorded in it.
+    :param verify: If True, hash-check files copied across filesystems before removing the source.
     """
     print(f"Scanning directory: {directory}")
-    files_by_extension = defaultdict(list)
-
-    # Group files by extension
-    for item in os.listdir(directory):
-        item_path = os.path.join(directory, item)
-        if os.path.isfile(item_path):
-            _, extension = os.path.splitext(item)
-            if extension:
-                files_by_extension[extension[1:].lower()].append(item)
+    scan_start = time.monotonic()
+    files_by_extension = _scan_directory(directory, sniff, workers)
+    scan_elapsed = time.monotonic() - scan_start
 
     if not files_by_extension:
         print("No files with extensions found to organize.")
@@ -37,22 +669,479 @@ def organize_directory(directory: str, dry_run: bool = False):
     if dry_run:
         print("\n[DRY RUN] The following operations would be performed:")
 
-    for ext, files in files_by_extension.items():
+    # Create every target directory up front so the move workers never race on mkdir.
+    for ext in files_by_extension:
         ext_dir = os.path.join(directory, ext)
-        if not os.path.exists(ext_dir):
+        if not os.path.isdir(ext_dir):
             print(f"Creating directory: {ext_dir}")
             if not dry_run:
-                os.makedirs(ext_dir)
+                os.makedirs(ext_dir, exist_ok=True)
 
+    moves = []
+    for ext, files in files_by_extension.items():
+        ext_dir = os.path.join(directory, ext)
         for file in files:
-            src_path = os.path.join(directory, file)
-            dest_path = os.path.join(ext_dir, file)
+            moves.append((os.path.join(directory, file), os.path.join(ext_dir, file)))
+
+    if dry_run:
+        for src_path, dest_path in moves:
             print(f"Moving '{src_path}' to '{dest_path}'")
-            if not dry_run:
-                shutil.move(src_path, dest_path)
+        print(f"\n[DRY RUN] {len(moves)} file(s) would be moved.")
+        return
+
+    print(f"\nMoving {len(moves)} file(s) with {workers} worker(s)...")
+    move_start = time.monotonic()
+    moved, errors = _run_moves(moves, workers, journal, verify)
+    move_elapsed = time.monotonic() - move_start
+
+    for src_path, error in errors:
+        print(f"Error moving '{src_path}': {error}")
+
+    rate = moved / move_elapsed if move_elapsed > 0 else 0.0
+    print("\nSummary:")
+    print(f"  Scanned in {scan_elapsed:.2f}s")
+    print(f"  Moved {moved} file(s) into {len(files_by_extension)} folder(s) "
+          f"in {move_elapsed:.2f}s ({rate:.0f} files/s)")
+    if errors:
+        print(f"  Failed: {len(errors)} file(s)")
 
     print("\nOrganization complete.")
 
+def _partial_hash(path: str, size: int) -> Tuple[str, Optional[str], int]:
+    """Hash the first and last PARTIAL_HASH_BLOCK bytes. Returns (path, digest, bytes read)."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, "rb") as f:
+            if size <= 2 * PARTIAL_HASH_BLOCK:
+                data = f.read()
+                digest.update(data)
+                return path, digest.hexdigest(), len(data)
+            head = f.read(PARTIAL_HASH_BLOCK)
+            f.seek(-PARTIAL_HASH_BLOCK, os.SEEK_END)
+            tail = f.read(PARTIAL_HASH_BLOCK)
+    except OSError:
+        return path, None, 0
+    digest.update(head)
+    digest.update(tail)
+    return path, digest.hexdigest(), len(head) + len(tail)
+
+
+def _full_hash(path: str) -> Tuple[str, Optional[str], int]:
+    """Hash a whole file with mmap (large files) or big buffered reads. Returns (path, digest, bytes read)."""
+    digest = hashlib.blake2b()
+    read = 0
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    digest.update(mm)
+                read = size
+            else:
+                buf = bytearray(HASH_BUFFER_SIZE)
+                view = memoryview(buf)
+                while True:
+                    n = f.readinto(buf)
+                    if not n:
+                        break
+                    digest.update(view[:n])
+                    read += n
+    except (OSError, ValueError):
+        return path, None, read
+    return path, digest.hexdigest(), read
+
+
+def _keeper_sort_key(path: str) -> Tuple[bool, int, str]:
+    """Prefer names without a copy suffix, then the shortest path."""
+    stem, _ = os.path.splitext(os.path.basename(path))
+    return bool(_COPY_SUFFIX_RE.search(stem)), len(path), path
+
+
+def _regroup(executor: ThreadPoolExecutor, hash_fn, groups: List[List[str]],
+             sizes: Dict[str, int]) -> Tuple[List[List[str]], int]:
+    """Split candidate groups by the digest hash_fn produces, dropping singletons.
+
+    Files from all groups go to the pool as one batch, so many small groups (usually
+    pairs) still keep every worker busy.
+    """
+    jobs = [(index, path) for index, group in enumerate(groups) for path in group]
+    if hash_fn is _partial_hash:
+        results = executor.map(lambda job: _partial_hash(job[1], sizes[job[1]]), jobs)
+    else:
+        results = executor.map(lambda job: hash_fn(job[1]), jobs)
+    bytes_read = 0
+    by_digest = defaultdict(list)
+    for (index, _), (path, digest, read) in zip(jobs, results):
+        bytes_read += read
+        if digest is not None:
+            by_digest[(index, digest)].append(path)
+    return [paths for paths in by_digest.values() if len(paths) > 1], bytes_read
+
+
+def find_duplicates(paths: Iterator[str], workers: int = DEFAULT_WORKERS) -> List[List[str]]:
+    """
+    Find groups of files with identical content.
+
+    Candidates are narrowed in stages so most files are never read in full:
+    first by size, then by a hash of the first and last blocks, and only then
+    by a full-content hash. Hard links to the same inode count as one file.
+    Each returned group is sorted with the file to keep first.
+    """
+    sizes = {}
+    by_size = defaultdict(list)
+    seen_inodes = set()
+    total_bytes = 0
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        if st.st_size == 0 or (st.st_dev, st.st_ino) in seen_inodes:
+            continue
+        seen_inodes.add((st.st_dev, st.st_ino))
+        sizes[path] = st.st_size
+        by_size[st.st_size].append(path)
+        total_bytes += st.st_size
+    candidates = [group for group in by_size.values() if len(group) > 1]
+    print(f"  {len(sizes)} file(s), {len(candidates)} size group(s) with possible duplicates")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        candidates, partial_read = _regroup(executor, _partial_hash, candidates, sizes)
+        print(f"  {len(candidates)} group(s) left after partial hashing")
+
+        # Files small enough to be fully covered by the partial hash are already settled.
+        settled = [g for g in candidates if sizes[g[0]] <= 2 * PARTIAL_HASH_BLOCK]
+        pending = [g for g in candidates if sizes[g[0]] > 2 * PARTIAL_HASH_BLOCK]
+        confirmed, full_read = _regroup(executor, _full_hash, pending, sizes)
+
+    bytes_read = partial_read + full_read
+    share = 100.0 * bytes_read / total_bytes if total_bytes else 0.0
+    print(f"  Read {bytes_read} of {total_bytes} byte(s) ({share:.1f}%)")
+    return [sorted(group, key=_keeper_sort_key) for group in settled + confirmed]
+
+
+def _replace_with_link(keeper: str, duplicate: str):
+    """Atomically replace duplicate with a hard link to keeper."""
+    tmp_path = f"{duplicate}.organize-link-tmp"
+    os.link(keeper, tmp_path)
+    try:
+        os.replace(tmp_path, duplicate)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def dedupe_directory(directory: str, action: str = "report", dry_run: bool = False,
+                     workers: int = DEFAULT_WORKERS, recursive: bool = False,
+                     max_depth: Optional[int] = None, excludes: Sequence[str] = ()):
+    """
+    Find duplicate files in a directory and report, hard-link or remove them.
+
+    :param directory: The directory to scan.
+    :param action: One of DEDUPE_ACTIONS. 'link' replaces each duplicate with a hard
+        link to the kept file; 'remove' deletes the duplicates.
+    :param dry_run: If True, print what 'link' or 'remove' would do without doing it.
+    :param workers: Number of hashing threads.
+    :param recursive: Also scan subdirectories.
+    :param max_depth: With recursive, maximum directory depth to descend into.
+    :param excludes: Glob patterns matched against names and root-relative paths to skip.
+    """
+    if action not in DEDUPE_ACTIONS:
+        raise ValueError(f"Unknown dedupe action: {action}")
+    print(f"Looking for duplicates in: {directory}")
+    start = time.monotonic()
+    depth = max_depth if recursive else 0
+    paths = (path for path, _ in _walk_tree(directory, depth, excludes, set()))
+    groups = find_duplicates(paths, workers)
+    elapsed = time.monotonic() - start
+
+    if not groups:
+        print(f"No duplicates found ({elapsed:.2f}s).")
+        return
+
+    if dry_run and action != "report":
+        print(f"\n[DRY RUN] The following duplicates would be {'linked' if action == 'link' else 'removed'}:")
+
+    duplicates = 0
+    reclaimable = 0
+    errors = 0
+    for group in groups:
+        keeper, rest = group[0], group[1:]
+        size = os.path.getsize(keeper)
+        print(f"\nKeeping '{keeper}' ({size} bytes)")
+        for duplicate in rest:
+            duplicates += 1
+            reclaimable += size
+            print(f"  duplicate: '{duplicate}'")
+            if action == "report" or dry_run:
+                continue
+            try:
+                if action == "link":
+                    _replace_with_link(keeper, duplicate)
+                else:
+                    os.remove(duplicate)
+            except OSError as e:
+                errors += 1
+                print(f"  Error handling '{duplicate}': {e}")
+
+    print("\nSummary:")
+    print(f"  {duplicates} duplicate(s) in {len(groups)} group(s), {reclaimable} byte(s) reclaimable")
+    print(f"  Finished in {elapsed:.2f}s")
+    if errors:
+        print(f"  Failed: {errors} file(s)")
+
+
+def undo_last_run(journal_path: str, dry_run: bool = False, verify: bool = False):
+    """
+    Reverse the most recent run recorded in a move journal that has not been undone yet.
+
+    Moves are replayed newest first. Files that are gone, or whose original location
+    is taken again, are reported and skipped. Extension folders left empty are
+    removed. The run is marked as undone only if every move was reverted.
+    """
+    if not os.path.isfile(journal_path):
+        print(f"No journal found at {journal_path}; nothing to undo.")
+        return
+
+    runs = {}
+    undone = set()
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write.
+                continue
+            op = record.get("op")
+            if op in ("begin", "move"):
+                moves = runs.setdefault(record["run"], [])
+                if op == "move":
+                    moves.append((record["src"], record["dst"]))
+            elif op == "undo":
+                undone.add(record["run"])
+
+    remaining = [run for run in runs if run not in undone]
+    if not remaining:
+        print("Nothing to undo.")
+        return
+    run = remaining[-1]
+    moves = runs[run]
+    print(f"Undoing run {run} ({len(moves)} move(s))")
+    if dry_run:
+        print("\n[DRY RUN] The following operations would be performed:")
+
+    restored = 0
+    failures = 0
+    for src_path, dest_path in reversed(moves):
+        if not os.path.lexists(dest_path):
+            print(f"Skipping '{dest_path}': no longer exists")
+            failures += 1
+            continue
+        if os.path.lexists(src_path):
+            print(f"Skipping '{dest_path}': '{src_path}' already exists")
+            failures += 1
+            continue
+        if dry_run:
+            print(f"Moving '{dest_path}' back to '{src_path}'")
+            continue
+        try:
+            os.makedirs(os.path.dirname(src_path), exist_ok=True)
+        except OSError as e:
+            print(f"Error restoring '{dest_path}': {e}")
+            failures += 1
+            continue
+        _, error = _move_file(dest_path, src_path, verify=verify)
+        if error:
+            print(f"Error restoring '{dest_path}': {error}")
+            failures += 1
+        else:
+            restored += 1
+
+    if dry_run:
+        return
+
+    for folder in sorted({os.path.dirname(dest) for _, dest in moves}, reverse=True):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            pass
+
+    if failures:
+        print(f"\nRestored {restored} file(s), {failures} could not be restored; "
+              f"run {run} is kept in the journal so --undo can be retried.")
+        return
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"op": "undo", "run": run, "time": time.time()}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    print(f"\nRestored {restored} file(s).")
+
+
+class _Inotify:
+    """Minimal ctypes wrapper around inotify for a single, non-recursive directory watch."""
+
+    def __init__(self, directory: str, mask: int):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}")
+
+    def read(self, timeout: Optional[float]) -> Tuple[List[str], bool]:
+        """
+        Wait up to timeout seconds (None = forever) for events.
+
+        Returns (file names, overflowed). On overflow the kernel dropped events, so
+        the caller should fall back to a full rescan.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return [], False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+        names = []
+        overflowed = False
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                overflowed = True
+            elif name and not mask & _IN_ISDIR:
+                names.append(os.fsdecode(name))
+        return names, overflowed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _watch_ignored(name: str) -> bool:
+    return name.startswith(".") or name.lower().endswith(WATCH_IGNORED_SUFFIXES)
+
+
+def _file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _organize_arrivals(directory: str, names: List[str], dry_run: bool,
+                       executor: Optional[ThreadPoolExecutor],
+                       journal: Optional[MoveJournal] = None, verify: bool = False):
+    """Move newly arrived top-level files into their extension folders."""
+    items = [(os.path.join(directory, name), name) for name in names]
+    if executor:
+        exts = _sniff_batch(executor, items)
+    else:
+        exts = [_classify(name) for name in names]
+    for (src_path, name), ext in zip(items, exts):
+        if not ext:
+            continue
+        ext_dir = os.path.join(directory, ext)
+        dest_path = os.path.join(ext_dir, name)
+        if dry_run:
+            print(f"[DRY RUN] Would move '{src_path}' to '{dest_path}'")
+            continue
+        try:
+            os.makedirs(ext_dir, exist_ok=True)
+            # The same name can arrive again after the first copy was filed away.
+            dest_path = _claim_destination(dest_path)
+        except OSError as e:
+            print(f"Error moving '{src_path}': {e}")
+            continue
+        _, error = _move_file(src_path, dest_path, journal, verify)
+        if error:
+            try:
+                os.remove(dest_path)
+            except OSError:
+                pass
+            print(f"Error moving '{src_path}': {error}")
+        else:
+            print(f"Moved '{src_path}' to '{dest_path}'")
+    if journal:
+        # Arrivals trickle in, so don't wait for a full batch before syncing.
+        journal.sync()
+
+
+def watch_directory(directory: str, dry_run: bool = False, workers: int = DEFAULT_WORKERS,
+                    sniff: bool = False, debounce: float = DEFAULT_DEBOUNCE,
+                    journal: Optional[MoveJournal] = None, verify: bool = False):
+    """
+    Organize a directory once, then keep organizing new arrivals as they appear.
+
+    Subscribes to inotify close-write and moved-to events on the directory (Linux
+    only), so only new files are processed instead of rescanning periodically. A
+    file is moved once it has seen no events for `debounce` seconds and its size
+    and mtime have stopped changing.
+
+    :param directory: The directory to watch.
+    :param dry_run: If True, print the changes that would be made without actually making them.
+    :param workers: Number of threads for the initial pass and for header sniffing.
+    :param sniff: If True, classify files by their header bytes, falling back to the extension.
+    :param debounce: Quiet period in seconds before a new file is moved.
+    :param journal: If given, every completed move is recorded in it (fsync'ed in batches).
+    :param verify: If True, hash-check files copied across filesystems before removing the source.
+    """
+    if not sys.platform.startswith("linux"):
+        print("Error: --watch requires Linux (inotify).")
+        sys.exit(1)
+
+    # Subscribe before the initial pass so nothing arriving during it is missed.
+    watcher = _Inotify(directory, _IN_CLOSE_WRITE | _IN_MOVED_TO)
+    organize_directory(directory, dry_run, workers, sniff, journal, verify)
+    print(f"\nWatching {directory} for new files (Ctrl+C to stop)...")
+
+    executor = ThreadPoolExecutor(max_workers=workers) if sniff else None
+    # name -> (deadline, (size, mtime_ns) when last seen)
+    pending = {}
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = max(0.0, min(d for d, _ in pending.values()) - now) if pending else None
+            names, overflowed = watcher.read(timeout)
+            now = time.monotonic()
+            if overflowed:
+                print("Warning: inotify queue overflowed, rescanning directory.")
+                organize_directory(directory, dry_run, workers, sniff, journal, verify)
+                pending.clear()
+                continue
+            for name in names:
+                if not _watch_ignored(name):
+                    pending[name] = (now + debounce, _file_signature(os.path.join(directory, name)))
+
+            due = []
+            for name, (deadline, signature) in list(pending.items()):
+                if deadline > now:
+                    continue
+                current = _file_signature(os.path.join(directory, name))
+                if current is None:
+                    # Gone already (renamed or deleted by its writer).
+                    del pending[name]
+                elif current != signature:
+                    pending[name] = (now + debounce, current)
+                else:
+                    del pending[name]
+                    due.append(name)
+            if due:
+                _organize_arrivals(directory, due, dry_run, executor, journal, verify)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        watcher.close()
+        if executor:
+            executor.shutdown()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Organize files in a directory by their extension.")
     parser.add_argument(
@@ -66,13 +1155,125 @@ def main():
         action="store_true",
         help="Print the changes that would be made without actually moving any files."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Maximum number of concurrent moves (defaults to {DEFAULT_WORKERS})."
+    )
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Organize files in all subdirectories too, streaming them through a bounded pipeline."
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help="With --recursive, how many directory levels to descend (0 = top level only)."
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="PATTERN",
+        help="With --recursive, skip files and directories matching this glob (repeatable)."
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"With --recursive, capacity of each pipeline queue (defaults to {DEFAULT_QUEUE_SIZE})."
+    )
+    parser.add_argument(
+        "--sniff",
+        action="store_true",
+        help="Classify files by their content (magic numbers in the first bytes) instead of "
+             "trusting the extension. Extensionless files are organized too."
+    )
+    parser.add_argument(
+        "--dedupe",
+        nargs="?",
+        const="report",
+        choices=DEDUPE_ACTIONS,
+        help="Find duplicate files instead of organizing: 'report' (default), "
+             "'link' to hard-link them to one copy, or 'remove' to delete them."
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and organize new files as they arrive (Linux, uses inotify)."
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help=f"With --watch, seconds a new file must stay unchanged before it is moved "
+             f"(defaults to {DEFAULT_DEBOUNCE})."
+    )
+    parser.add_argument(
+        "--undo",
+        action="store_true",
+        help="Move the files of the most recent journaled run back where they came from."
+    )
+    parser.add_argument(
+        "--journal",
+        metavar="PATH",
+        help=f"Move journal to append to / undo from (defaults to <directory>/{JOURNAL_NAME})."
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Do not record moves (the run cannot be undone)."
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Hash-check files copied across filesystems before deleting the originals."
+    )
     args = parser.parse_args()
 
     if not os.path.isdir(args.directory):
         print(f"Error: Directory not found: {args.directory}")
         sys.exit(1)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.max_depth is not None and args.max_depth < 0:
+        parser.error("--max-depth cannot be negative")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be at least 1")
+
+    if args.watch and (args.recursive or args.dedupe):
+        parser.error("--watch cannot be combined with --recursive or --dedupe")
+    if args.debounce < 0:
+        parser.error("--debounce cannot be negative")
+
+    journal_path = args.journal or os.path.join(args.directory, JOURNAL_NAME)
+    if args.undo:
+        undo_last_run(journal_path, args.dry_run, args.verify)
+        return
 
-    organize_directory(args.directory, args.dry_run)
+    journal = None
+    if not args.dry_run and not args.no_journal and not args.dedupe:
+        journal = MoveJournal(journal_path, args.directory)
+    try:
+        if args.watch:
+            watch_directory(args.directory, args.dry_run, args.workers, args.sniff, args.debounce,
+                            journal, args.verify)
+        elif args.dedupe:
+            dedupe_directory(args.directory, args.dedupe, args.dry_run, args.workers,
+                             args.recursive, args.max_depth, args.exclude)
+        elif args.recursive:
+            organize_tree(args.directory, args.dry_run, args.workers, args.max_depth, args.exclude,
+                          args.queue_size, args.sniff, journal, args.verify)
+        else:
+            organize_directory(args.directory, args.dry_run, args.workers, args.sniff,
+                               journal, args.verify)
+    finally:
+        if journal:
+            journal.close()
+        if journal and journal.moves:
+            print(f"Moves recorded in {journal.path} (undo with --undo).")
 
 if __name__ == "__main__":
     main()
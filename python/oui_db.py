@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Offline IEEE OUI vendor database
+Builds a compact, sorted binary index from the IEEE MA-L/MA-M/MA-S registry files
+and answers vendor lookups from a memory-mapped copy with longest-prefix binary search.
+"""
+
+import os
+import io
+import csv
+import sys
+import mmap
+import struct
+import argparse
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+# Public registry exports published by the IEEE Registration Authority.
+IEEE_REGISTRY_URLS = {
+    "MA-L": "https://standards-oui.ieee.org/oui/oui.csv",
+    "MA-M": "https://standards-oui.ieee.org/oui28/mam.csv",
+    "MA-S": "https://standards-oui.ieee.org/oui36/oui36.csv",
+}
+
+DEFAULT_DB_PATH = os.path.join(
+    os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")),
+    "mac_manager", "oui.db",
+)
+
+# File layout (all integers big-endian):
+#   header:  magic, record count, offset of the string table
+#   records: sorted by (prefix length, prefix); each is the 48-bit prefix left-aligned
+#            in 6 bytes, the prefix length in bits, and the vendor's string offset
+#   strings: deduplicated vendor names, each a 2-byte length followed by UTF-8
+_MAGIC = b"OUIDB1\0\0"
+_HEADER = struct.Struct(">8sII")
+_RECORD = struct.Struct(">6sBI")
+_STRING_LEN = struct.Struct(">H")
+
+# Assignment lengths in hex digits -> prefix length in bits.
+_PREFIX_BITS = {6: 24, 7: 28, 9: 36}
+
+# Longest prefix first, so MA-S/MA-M blocks win over the MA-L block they are carved from.
+_LOOKUP_ORDER = (36, 28, 24)
+
+
+def parse_registry(stream: Iterable[str]) -> Iterator[Tuple[int, int, str]]:
+    """
+    Parse an IEEE registry CSV export (oui.csv, mam.csv, oui36.csv).
+
+    Yields (prefix as a left-aligned 48-bit int, prefix length in bits, vendor).
+    """
+    for row in csv.reader(stream):
+        if len(row) < 3 or row[0] == "Registry":
+            continue
+        assignment = row[1].strip()
+        vendor = row[2].strip()
+        bits = _PREFIX_BITS.get(len(assignment))
+        if not bits or not vendor:
+            continue
+        try:
+            value = int(assignment, 16)
+        except ValueError:
+            continue
+        yield value << (48 - bits), bits, vendor
+
+
+def build_database(entries: Iterable[Tuple[int, int, str]], output: str) -> int:
+    """Write entries to a new database file at output (atomically). Returns the record count."""
+    records: Dict[Tuple[int, int], str] = {}
+    for prefix, bits, vendor in entries:
+        records[(bits, prefix)] = vendor
+
+    strings = io.BytesIO()
+    string_offsets: Dict[str, int] = {}
+    packed = []
+    for bits, prefix in sorted(records):
+        vendor = records[(bits, prefix)]
+        offset = string_offsets.get(vendor)
+        if offset is None:
+            encoded = vendor.encode("utf-8")[:0xFFFF]
+            offset = strings.tell()
+            strings.write(_STRING_LEN.pack(len(encoded)))
+            strings.write(encoded)
+            string_offsets[vendor] = offset
+        packed.append(_RECORD.pack(prefix.to_bytes(6, "big"), bits, offset))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, len(packed), _HEADER.size + len(packed) * _RECORD.size))
+        f.write(b"".join(packed))
+        f.write(strings.getvalue())
+    os.replace(tmp_path, output)
+    return len(packed)
+
+
+def fetch_registries(urls: Iterable[str], timeout: float = 60.0) -> Iterator[Tuple[int, int, str]]:
+    """Download registry CSVs and yield their parsed entries."""
+    from urllib.request import Request, urlopen
+
+    for url in urls:
+        # The IEEE site rejects requests without a browser-like User-Agent.
+        request = Request(url, headers={"User-Agent": "Mozilla/5.0 (mac_manager oui_db)"})
+        with urlopen(request, timeout=timeout) as response:
+            text = io.TextIOWrapper(response, encoding="utf-8", errors="replace", newline="")
+            yield from parse_registry(text)
+
+
+class OUIDatabase:
+    """Read-only, memory-mapped view of a database written by build_database."""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._mm)
+        if size < _HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated")
+        magic, self.count, self._strings = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not an OUI database")
+        if not _HEADER.size + self.count * _RECORD.size <= self._strings <= size:
+            self._mm.close()
+            raise ValueError(f"{path} is truncated or corrupt")
+        # Records are grouped by prefix length; find where each group starts and ends.
+        self._ranges = {bits: self._group_range(bits) for bits in _LOOKUP_ORDER}
+
+    def _record(self, index: int) -> Tuple[bytes, int, int]:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + index * _RECORD.size)
+
+    def _group_range(self, bits: int) -> Tuple[int, int]:
+        def first_at_least(target: int) -> int:
+            lo, hi = 0, self.count
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._record(mid)[1] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            return lo
+        return first_at_least(bits), first_at_least(bits + 1)
+
+    def _vendor(self, offset: int) -> str:
+        start = self._strings + offset
+        (length,) = _STRING_LEN.unpack_from(self._mm, start)
+        start += _STRING_LEN.size
+        return self._mm[start:start + length].decode("utf-8", errors="replace")
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """Return the registered vendor for a MAC address, or None if it is not assigned."""
+        clean = "".join(c for c in mac if c in "0123456789abcdefABCDEF")
+        if len(clean) != 12:
+            return None
+        value = int(clean, 16)
+        for bits in _LOOKUP_ORDER:
+            key = (value >> (48 - bits) << (48 - bits)).to_bytes(6, "big")
+            lo, hi = self._ranges[bits]
+            while lo < hi:
+                mid = (lo + hi) // 2
+                prefix, _, offset = self._record(mid)
+                if prefix < key:
+                    lo = mid + 1
+                elif prefix > key:
+                    hi = mid
+                else:
+                    return self._vendor(offset)
+        return None
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_default() -> Optional[OUIDatabase]:
+    """Open the database at MAC_MANAGER_OUI_DB or the default path, or None if it is unavailable."""
+    path = os.environ.get("MAC_MANAGER_OUI_DB", DEFAULT_DB_PATH)
+    try:
+        return OUIDatabase(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline OUI vendor database.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Build the database from IEEE registry CSV files.")
+    build.add_argument("files", nargs="*", help="Registry CSV files (oui.csv, mam.csv, oui36.csv).")
+    build.add_argument("--fetch", action="store_true",
+                       help="Download the MA-L, MA-M and MA-S registries from the IEEE instead.")
+    build.add_argument("--output", default=os.environ.get("MAC_MANAGER_OUI_DB", DEFAULT_DB_PATH),
+                       help=f"Where to write the database (default: {DEFAULT_DB_PATH}).")
+
+    lookup = sub.add_parser("lookup", help="Look up the vendor for one or more MAC addresses.")
+    lookup.add_argument("macs", nargs="+")
+    lookup.add_argument("--db", default=os.environ.get("MAC_MANAGER_OUI_DB", DEFAULT_DB_PATH))
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if args.fetch:
+            entries = fetch_registries(IEEE_REGISTRY_URLS.values())
+        elif args.files:
+            def from_files() -> Iterator[Tuple[int, int, str]]:
+                for path in args.files:
+                    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+                        yield from parse_registry(f)
+            entries = from_files()
+        else:
+            parser.error("give registry CSV files or --fetch")
+        count = build_database(entries, args.output)
+        print(f"Wrote {count} prefixes to {args.output}")
+
+    elif args.command == "lookup":
+        try:
+            db = OUIDatabase(args.db)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot open OUI database: {e}", file=sys.stderr)
+            sys.exit(1)
+        with db:
+            for mac in args.macs:
+                print(f"{mac}\t{db.lookup(mac) or 'Unknown Vendor'}")
+
+
+if __name__ == "__main__":
+    main()
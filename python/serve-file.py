@@ -3,19 +3,223 @@
 Simple HTTP server that serves a single file or directory.
 For single files, redirects root to the file.
 For directories, shows listing.
+With --upload, also accepts files:
+  curl -T big.iso http://host:port/big.iso                  (PUT)
+  curl -F file=@big.iso http://host:port/                   (multipart POST)
+Add -H "X-Checksum-Sha256: <hex>" (or a "sha256" form field before the file) to have the
+upload verified before it is renamed into place. Existing files are only replaced with
+--overwrite; when serving a single file, only that file can be uploaded.
 """
 
 import http.server
 import socketserver
+import argparse
+import email.message
+import functools
+import hashlib
+import shutil
+import stat
+import tempfile
 import sys
 import os
 from urllib.parse import unquote
 
+# Size of each read from the socket and write to disk during an upload.
+UPLOAD_BUFFER = 1 << 20
+
+CHECKSUM_HEADER = 'X-Checksum-Sha256'
+
+# Read once at startup: os.umask can only be queried by setting it, which isn't thread-safe.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class UploadError(Exception):
+    """An upload that was rejected; carries the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class BodyReader:
+    """Reads a request body, sized by Content-Length or chunked, in large blocks."""
+
+    def __init__(self, rfile, length=None):
+        self.rfile = rfile
+        self.remaining = length
+        self.chunked = length is None
+        self.chunk_left = 0
+        self.done = False
+
+    def readinto(self, view):
+        """Read up to len(view) bytes of the body into view; 0 means the body is complete."""
+        if self.done:
+            return 0
+        if self.chunked:
+            if self.chunk_left == 0:
+                line = self.rfile.readline(65537)
+                try:
+                    size = int(line.split(b';')[0], 16)
+                except ValueError:
+                    raise UploadError(400, 'Malformed chunked body')
+                if size == 0:
+                    # Skip trailers up to the blank line that ends the body
+                    while self.rfile.readline(65537) not in (b'\r\n', b'\n', b''):
+                        pass
+                    self.done = True
+                    return 0
+                self.chunk_left = size
+            want = min(len(view), self.chunk_left)
+        else:
+            want = min(len(view), self.remaining)
+            if want == 0:
+                self.done = True
+                return 0
+        n = self.rfile.readinto(view[:want])
+        if not n:
+            raise UploadError(400, 'Connection closed before the upload was complete')
+        if self.chunked:
+            self.chunk_left -= n
+            if self.chunk_left == 0:
+                self.rfile.readline(3)  # CRLF after the chunk data
+        else:
+            self.remaining -= n
+        return n
+
+
+class UploadFile:
+    """A temporary file next to the destination, renamed over it only once complete."""
+
+    def __init__(self, dest, expected_sha256=None):
+        self.dest = dest
+        self.expected = expected_sha256.lower() if expected_sha256 else None
+        self.hash = hashlib.sha256() if self.expected else None
+        self.size = 0
+        fd, self.tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix='.upload-', suffix='.part')
+        self.file = os.fdopen(fd, 'wb', buffering=UPLOAD_BUFFER)
+
+    def write(self, data):
+        self.file.write(data)
+        if self.hash:
+            self.hash.update(data)
+        self.size += len(data)
+
+    def commit(self, overwrite=False):
+        """Verify the checksum, flush to disk and atomically move the file into place.
+
+        A replaced file keeps its permissions; a new one gets 0666 minus the umask. Without
+        overwrite, an existing destination (even one created during the upload) is kept.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        if self.hash and self.hash.hexdigest() != self.expected:
+            self.abort()
+            raise UploadError(422, f'SHA-256 mismatch for {os.path.basename(self.dest)}: '
+                                   f'got {self.hash.hexdigest()}')
+        try:
+            mode = stat.S_IMODE(os.stat(self.dest).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(self.tmp, mode)
+        if overwrite:
+            os.replace(self.tmp, self.dest)
+            return
+        try:
+            # link() fails instead of replacing, so a file that appeared meanwhile survives
+            os.link(self.tmp, self.dest)
+        except FileExistsError:
+            self.abort()
+            raise UploadError(409, f'{os.path.basename(self.dest)} already exists (start with --overwrite)')
+        except OSError:
+            # Filesystems without hard links
+            if os.path.exists(self.dest):
+                self.abort()
+                raise UploadError(409, f'{os.path.basename(self.dest)} already exists (start with --overwrite)')
+            os.replace(self.tmp, self.dest)
+            return
+        os.unlink(self.tmp)
+
+    def abort(self):
+        if not self.file.closed:
+            self.file.close()
+        try:
+            os.unlink(self.tmp)
+        except FileNotFoundError:
+            pass
+
+
+class MultipartReader:
+    """Streams a multipart/form-data body part by part without buffering whole parts."""
+
+    MAX_LINE = 65536
+
+    def __init__(self, body, boundary):
+        self.body = body
+        # The leading CRLF belongs to the delimiter, so start with one for the first boundary
+        self.delimiter = b'\r\n--' + boundary
+        self.buf = bytearray(b'\r\n')
+        self.block = bytearray(UPLOAD_BUFFER)
+
+    def _fill(self):
+        with memoryview(self.block) as view:
+            n = self.body.readinto(view)
+            if not n:
+                raise UploadError(400, 'Multipart body ended before its closing boundary')
+            self.buf += view[:n]
+
+    def readline(self):
+        while True:
+            end = self.buf.find(b'\r\n')
+            if end >= 0:
+                line = bytes(self.buf[:end])
+                del self.buf[:end + 2]
+                return line
+            if len(self.buf) > self.MAX_LINE:
+                raise UploadError(400, 'Multipart header line too long')
+            self._fill()
+
+    def read_part(self, sink=None):
+        """Pass the data up to the next boundary to sink (or drop it) and consume the boundary."""
+        keep = len(self.delimiter) - 1
+        while True:
+            end = self.buf.find(self.delimiter)
+            if end >= 0:
+                if sink and end:
+                    with memoryview(self.buf) as view, view[:end] as data:
+                        sink(data)
+                del self.buf[:end + len(self.delimiter)]
+                return
+            # Everything but a possible partial delimiter at the end is part data
+            cut = len(self.buf) - keep
+            if cut > 0:
+                if sink:
+                    with memoryview(self.buf) as view, view[:cut] as data:
+                        sink(data)
+                del self.buf[:cut]
+            self._fill()
+
+    def read_headers(self):
+        """Read the headers of the next part; None after the closing boundary."""
+        if self.readline().startswith(b'--'):
+            return None
+        msg = email.message.Message()
+        while True:
+            line = self.readline()
+            if not line:
+                return msg
+            name, _, value = line.decode('utf-8', 'replace').partition(':')
+            msg[name.strip()] = value.strip()
+
+
 class SingleFileHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, single_file=None, **kwargs):
+    def __init__(self, *args, single_file=None, upload=False, overwrite=False, **kwargs):
         self.single_file = single_file
+        self.upload = upload
+        self.overwrite = overwrite
         super().__init__(*args, **kwargs)
-    
+
     def do_GET(self):
         # If we're serving a single file and request is for root, redirect to the file
         if self.single_file and self.path in ['/', '/index.html']:
@@ -24,15 +228,139 @@ class SingleFileHandler(http.server.SimpleHTTPRequestHandler):
             self.send_header('Location', '/' + os.path.basename(self.single_file))
             self.end_headers()
             return
-        
+
         # For image files, ensure proper content type
         if self.path.endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')):
             # Serve the image with proper headers
             return super().do_GET()
-        
+
         # Default behavior for everything else
         return super().do_GET()
-    
+
+    def do_PUT(self):
+        """Store the request body as the file named by the path."""
+        self._handle_upload(self._receive_put)
+
+    def do_POST(self):
+        """Store every file part of a multipart/form-data body in the directory named by the path."""
+        self._handle_upload(self._receive_multipart)
+
+    def _handle_upload(self, receive):
+        if not self.upload:
+            self.send_error(405, 'Uploads are disabled (start with --upload)')
+            return
+        try:
+            saved = receive(self._body_reader())
+        except UploadError as e:
+            # The rest of the body may be unread, so don't reuse the connection
+            self.close_connection = True
+            self.send_error(e.status, str(e))
+            return
+        except OSError as e:
+            self.close_connection = True
+            self.send_error(500, f'Upload failed: {e.strerror or e}')
+            return
+        body = ''.join(f'{name} {size}\n' for name, size in saved).encode()
+        self.send_response(201)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body_reader(self):
+        if 'chunked' in self.headers.get('Transfer-Encoding', '').lower():
+            return BodyReader(self.rfile)
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            raise UploadError(411, 'Content-Length or chunked Transfer-Encoding required')
+        return BodyReader(self.rfile, int(length))
+
+    def _check_destination(self, dest):
+        """Refuse destinations other than the served file (single-file mode) or existing files."""
+        if self.single_file and os.path.abspath(dest) != os.path.abspath(self.single_file):
+            raise UploadError(403, f'Only {self.single_file} can be uploaded')
+        if os.path.exists(dest) and not self.overwrite:
+            raise UploadError(409, f'{os.path.basename(dest)} already exists (start with --overwrite)')
+
+    def _check_space(self, directory, body):
+        if body.remaining is not None and body.remaining > shutil.disk_usage(directory).free:
+            raise UploadError(507, 'Not enough free space for the upload')
+
+    def _receive_put(self, body):
+        dest = self.translate_path(self.path)
+        if self.path.endswith('/') or os.path.isdir(dest):
+            raise UploadError(409, 'PUT needs a file name, not a directory')
+        if not os.path.isdir(os.path.dirname(dest)):
+            raise UploadError(409, 'Parent directory does not exist')
+        self._check_destination(dest)
+        self._check_space(os.path.dirname(dest), body)
+
+        upload = UploadFile(dest, self.headers.get(CHECKSUM_HEADER))
+        try:
+            # Read straight into one reusable buffer and hand it to the file unchanged
+            block = bytearray(UPLOAD_BUFFER)
+            with memoryview(block) as view:
+                while True:
+                    n = body.readinto(view)
+                    if not n:
+                        break
+                    with view[:n] as data:
+                        upload.write(data)
+            upload.commit(self.overwrite)
+        except BaseException:
+            upload.abort()
+            raise
+        return [(os.path.relpath(dest), upload.size)]
+
+    def _receive_multipart(self, body):
+        directory = self.translate_path(self.path)
+        if not os.path.isdir(directory):
+            raise UploadError(404, 'Upload directory does not exist')
+        msg = email.message.Message()
+        msg['Content-Type'] = self.headers.get('Content-Type', '')
+        boundary = msg.get_param('boundary')
+        if msg.get_content_type() != 'multipart/form-data' or not boundary:
+            raise UploadError(415, 'Expected multipart/form-data with a boundary')
+        self._check_space(directory, body)
+
+        reader = MultipartReader(body, boundary.encode('latin-1'))
+        reader.read_part()  # preamble
+        saved = []
+        expected = self.headers.get(CHECKSUM_HEADER)
+        while True:
+            headers = reader.read_headers()
+            if headers is None:
+                return saved
+            filename = headers.get_filename()
+            if not filename:
+                # Plain form field: only a "sha256" value for the following file is used
+                value = bytearray()
+
+                def collect(data):
+                    if len(value) < 1024:
+                        value.extend(data)
+
+                reader.read_part(collect)
+                if headers.get_param('name', header='content-disposition') == 'sha256':
+                    expected = value.decode('ascii', 'replace').strip()
+                continue
+            name = os.path.basename(filename.replace('\\', '/'))
+            if name in ('', '.', '..'):
+                raise UploadError(400, f'Invalid file name: {filename!r}')
+            dest = os.path.join(directory, name)
+            if os.path.isdir(dest):
+                raise UploadError(409, f'{name} is a directory')
+            self._check_destination(dest)
+            upload = UploadFile(dest, expected)
+            try:
+                reader.read_part(upload.write)
+                upload.commit(self.overwrite)
+            except BaseException:
+                upload.abort()
+                raise
+            saved.append((os.path.relpath(dest), upload.size))
+            expected = None
+
     def guess_type(self, path):
         """Ensure correct MIME types for images"""
         mimetype = super().guess_type(path)
@@ -40,45 +368,55 @@ class SingleFileHandler(http.server.SimpleHTTPRequestHandler):
             return 'image/svg+xml'
         return mimetype
 
-def serve_file_or_directory(path, port):
+
+class ThreadingServer(socketserver.ThreadingTCPServer):
+    # A long upload or download must not block other clients
+    daemon_threads = True
+
+
+def serve_file_or_directory(path, port, upload=False, overwrite=False):
     """Serve a single file or directory on the specified port"""
-    
+
     # Check if path is a file or directory
     is_single_file = os.path.isfile(path)
-    
+
     if is_single_file:
         # Serve from the file's directory
         directory = os.path.dirname(os.path.abspath(path))
         filename = os.path.basename(path)
         os.chdir(directory)
-        
+
         # Create handler with single file info
-        handler = lambda *args, **kwargs: SingleFileHandler(
-            *args, 
-            single_file=filename,
-            **kwargs
-        )
+        handler = functools.partial(SingleFileHandler, single_file=filename, upload=upload,
+                                    overwrite=overwrite)
         print(f"Serving file: {filename} from {directory}")
     else:
         # Serve directory
         os.chdir(path if path else '.')
-        handler = SingleFileHandler
+        handler = functools.partial(SingleFileHandler, upload=upload, overwrite=overwrite)
         print(f"Serving directory: {os.getcwd()}")
-    
-    with socketserver.TCPServer(("", port), handler) as httpd:
+    if upload and is_single_file:
+        print(f"Uploads enabled for {filename} only" + (" (replacing it)" if overwrite else ""))
+    elif upload:
+        print(f"Uploads enabled: PUT /<name> or multipart POST into {os.getcwd()}"
+              + (" (existing files may be replaced)" if overwrite else ""))
+
+    with ThreadingServer(("", port), handler) as httpd:
         print(f"Server running on port {port}")
         httpd.serve_forever()
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: serve-file.py <port> [file_or_directory]")
-        sys.exit(1)
-    
-    port = int(sys.argv[1])
-    path = sys.argv[2] if len(sys.argv) > 2 else '.'
-    
+    parser = argparse.ArgumentParser(usage="serve-file.py <port> [file_or_directory] [--upload [--overwrite]]")
+    parser.add_argument("port", type=int)
+    parser.add_argument("path", nargs="?", default=".")
+    parser.add_argument("--upload", action="store_true",
+                        help="Accept PUT and multipart POST uploads into the served directory")
+    parser.add_argument("--overwrite", action="store_true",
+                        help="Let uploads replace existing files (keeping their permissions)")
+    args = parser.parse_args()
+
     try:
-        serve_file_or_directory(path, port)
+        serve_file_or_directory(args.path, args.port, args.upload, args.overwrite)
     except KeyboardInterrupt:
         print("\nServer stopped")
-        sys.exit(0)
\ No newline at end of file
+        sys.exit(0)
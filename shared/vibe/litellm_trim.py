@@ -38,14 +38,46 @@ Tunables (env vars, all optional)
 - LITELLM_TRIM_LOG            path to append a one-line audit log per trim,
                               default ~/.vibe/logs/trim.log
 - LITELLM_TRIM_DISABLE        set to "1" to bypass entirely (debugging)
+- LITELLM_TRIM_CONFIG         proxy config whose model_list is prewarmed,
+                              default ~/.vibe/litellm-config.yaml
+- LITELLM_TRIM_PREWARM        set to "0" to skip warming tokenizers at startup
+- LITELLM_TRIM_BUDGET_MS      time the hook may spend counting per request,
+                              default 250 (0 = unlimited)
+- LITELLM_TRIM_ESTIMATE_MARGIN extra tokens held back when the budget runs
+                              out and the estimator takes over, default 4000
+- LITELLM_TRIM_BREAKER_TRIPS  blown budgets within LITELLM_TRIM_BREAKER_WINDOW_S
+                              (default 3 within 60s) that switch the hook to
+                              estimator-only for LITELLM_TRIM_BREAKER_COOLDOWN_S
+                              (default 300)
+
+Tokenizer warm-up
+-----------------
+Loading a model's tokenizer takes seconds the first time, and doing that
+inside the hook stalls the first long request after every restart. So
+each model's tokenizer is loaded by a `token_counter` call on a
+background thread: every model in LITELLM_TRIM_CONFIG as soon as the
+proxy imports this file, plus any other model the first time it is seen.
+Until a model is warm, _count uses the char-based estimator, which
+over-counts (so it can only trim early, never let an oversize prompt by).
+
+Latency budget
+--------------
+The hook must never be the slowest hop. Exact counting stops once the
+request has used LITELLM_TRIM_BUDGET_MS; the rest of the trim runs on the
+estimator with ESTIMATE_MARGIN extra headroom. When budgets keep being
+blown (huge transcripts, a slow tokenizer), a circuit breaker skips exact
+counting entirely for a cool-down period and logs `breaker_open`.
 """
 
 from __future__ import annotations
 
 import os
+import re
 import json
 import time
+import threading
 import traceback
+from collections import deque
 from pathlib import Path
 from typing import Any, Optional
 
@@ -60,6 +92,16 @@ LOG_PATH = Path(
 )
 DISABLED = os.environ.get("LITELLM_TRIM_DISABLE") == "1"
 DEBUG = os.environ.get("LITELLM_TRIM_DEBUG") == "1"
+CONFIG_PATH = Path(
+    os.environ.get("LITELLM_TRIM_CONFIG", str(Path.home() / ".vibe/litellm-config.yaml"))
+)
+PREWARM = os.environ.get("LITELLM_TRIM_PREWARM", "1") != "0"
+
+BUDGET_S = int(os.environ.get("LITELLM_TRIM_BUDGET_MS", "250")) / 1000
+ESTIMATE_MARGIN = int(os.environ.get("LITELLM_TRIM_ESTIMATE_MARGIN", "4000"))
+BREAKER_TRIPS = int(os.environ.get("LITELLM_TRIM_BREAKER_TRIPS", "3"))
+BREAKER_WINDOW_S = float(os.environ.get("LITELLM_TRIM_BREAKER_WINDOW_S", "60"))
+BREAKER_COOLDOWN_S = float(os.environ.get("LITELLM_TRIM_BREAKER_COOLDOWN_S", "300"))
 
 # Safety margin subtracted from TARGET to account for the chat-format
 # overhead (role tags, tool-call wrappers) that token_counter approximates.
@@ -76,29 +118,133 @@ def _log(record: dict) -> None:
         pass
 
 
-def _count(messages, model: str) -> int:
+# Models whose tokenizer is loaded (exact counts) / being loaded right now.
+_READY: set[str] = set()
+_WARMING: set[str] = set()
+_WARM_LOCK = threading.Lock()
+
+
+def _config_models(path: Path) -> list[str]:
+    """Every model_name and upstream model id in the proxy config's model_list."""
+    try:
+        text = path.read_text()
+    except OSError:
+        return []
+    names: list[str] = []
+    try:
+        import yaml
+
+        for entry in (yaml.safe_load(text) or {}).get("model_list") or []:
+            names.append(entry.get("model_name"))
+            names.append((entry.get("litellm_params") or {}).get("model"))
+    except Exception:
+        # No PyYAML (or a config it can't parse): the keys are simple enough to grep.
+        names = re.findall(r"^\s*-?\s*model(?:_name)?:\s*(\S+)", text, re.MULTILINE)
+    return list(dict.fromkeys(n for n in names if isinstance(n, str) and n))
+
+
+def _warm(models: list[str]) -> None:
+    start = time.monotonic()
+    for model in models:
+        try:
+            token_counter(model=model, messages=[{"role": "user", "content": "warm up"}])
+        except Exception:
+            pass  # unknown to litellm: _count falls back to the estimator for it anyway
+        with _WARM_LOCK:
+            _WARMING.discard(model)
+            _READY.add(model)
+    if DEBUG or len(models) > 1:
+        _log({"event": "tokenizers_warm", "models": len(models),
+              "seconds": round(time.monotonic() - start, 2)})
+
+
+def _schedule_warm(models: list[str]) -> None:
+    """Load the tokenizers for models on a daemon thread, unless already loaded or loading."""
+    with _WARM_LOCK:
+        todo = [m for m in models if m not in _READY and m not in _WARMING]
+        _WARMING.update(todo)
+    if todo:
+        threading.Thread(target=_warm, args=(todo,), name="litellm-trim-warm", daemon=True).start()
+
+
+def _chars(message) -> int:
+    """Characters the estimator charges for one message."""
+    content = message.get("content")
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return sum(len(json.dumps(block, default=str)) for block in content if isinstance(block, dict))
+    return len(str(content)) if content else 0
+
+
+def _estimate(messages) -> int:
+    """Cheap token estimate: chars / 3, which over-counts typical text and JSON."""
+    return sum(map(_chars, messages)) // 3
+
+
+class _Deadline:
+    """Per-request time budget: exact counts until it runs out, estimates after."""
+
+    def __init__(self, seconds: float, expired: bool = False) -> None:
+        self.end = time.monotonic() + seconds if seconds > 0 else None
+        self.expired = expired
+
+    def exact(self) -> bool:
+        if not self.expired and self.end is not None and time.monotonic() > self.end:
+            self.expired = True
+        return not self.expired
+
+
+class _CircuitBreaker:
+    """Opens (estimator-only mode) after BREAKER_TRIPS blown budgets within the window."""
+
+    def __init__(self, trips: int, window: float, cooldown: float) -> None:
+        self.trips = trips
+        self.window = window
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self._blown: deque[float] = deque()
+
+    def is_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    def record(self, blown: bool) -> None:
+        if not blown:
+            return
+        now = time.monotonic()
+        self._blown.append(now)
+        while self._blown and self._blown[0] < now - self.window:
+            self._blown.popleft()
+        if len(self._blown) >= self.trips:
+            self.open_until = now + self.cooldown
+            self._blown.clear()
+            _log({"event": "breaker_open", "cooldown_s": self.cooldown,
+                  "trips": self.trips, "window_s": self.window})
+
+
+_BREAKER = _CircuitBreaker(BREAKER_TRIPS, BREAKER_WINDOW_S, BREAKER_COOLDOWN_S)
+
+
+def _count(messages, model: str, deadline: Optional[_Deadline] = None) -> int:
+    if deadline is not None and not deadline.exact():
+        return _estimate(messages)
+    if model not in _READY:
+        # Never load a tokenizer on the request path; estimate until it's warm.
+        _schedule_warm([model])
+        return _estimate(messages)
     try:
         return token_counter(model=model, messages=messages)
     except Exception:
-        # token_counter can fail on unknown model names; estimate by char count / 3.5
-        total_chars = 0
-        for m in messages:
-            content = m.get("content")
-            if isinstance(content, str):
-                total_chars += len(content)
-            elif isinstance(content, list):
-                for block in content:
-                    if isinstance(block, dict):
-                        total_chars += len(json.dumps(block, default=str))
-            else:
-                total_chars += len(str(content)) if content else 0
-        return total_chars // 3
+        # token_counter can fail on unknown model names
+        return _estimate(messages)
 
 
 MIN_TAIL = 2  # never drop below this — preserves at least the current user turn
 
 
-def _trim(messages: list[dict], model: str, target: int) -> tuple[list[dict], int, int, int]:
+def _trim(
+    messages: list[dict], model: str, target: int, deadline: Optional[_Deadline] = None
+) -> tuple[list[dict], int, int, int]:
     """
     Returns (new_messages, dropped_count, original_tokens, new_tokens).
 
@@ -113,9 +259,19 @@ def _trim(messages: list[dict], model: str, target: int) -> tuple[list[dict], in
       6. If even sys + marker + MIN_TAIL tail can't fit, return what we
          have and let the upstream raise — context_window_fallbacks
          (configured in litellm-config.yaml) takes it from there.
+
+    Once `deadline` expires, counts come from the estimator and the budget
+    shrinks by ESTIMATE_MARGIN to cover its error.
     """
-    original = _count(messages, model)
-    if original <= target - SAFETY_MARGIN:
+    def count(msgs) -> int:
+        return _count(msgs, model, deadline)
+
+    def limit() -> int:
+        degraded = deadline is not None and deadline.expired
+        return target - SAFETY_MARGIN - (ESTIMATE_MARGIN if degraded else 0)
+
+    original = count(messages)
+    if original <= limit():
         return messages, 0, original, original
 
     sys_msgs = [m for m in messages if m.get("role") == "system"]
@@ -130,7 +286,6 @@ def _trim(messages: list[dict], model: str, target: int) -> tuple[list[dict], in
     head = list(other[:-desired_tail])
 
     dropped = 0
-    budget = target - SAFETY_MARGIN
 
     def _build(head_list, tail_list, drop_count):
         marker = {
@@ -142,11 +297,36 @@ def _trim(messages: list[dict], model: str, target: int) -> tuple[list[dict], in
         }
         return sys_msgs + [marker] + head_list + tail_list
 
+    def estimating() -> bool:
+        # Same conditions under which _count falls back to the estimator
+        return (deadline is not None and not deadline.exact()) or model not in _READY
+
+    def drop_estimated(rest: list[dict], dropped: int):
+        """Finish phases 1-3 on estimates: each message is sized once and the
+        total kept as a running sum, instead of re-estimating every candidate."""
+        fixed = sum(map(_chars, sys_msgs))
+        sizes = [_chars(m) for m in rest]
+        remaining = sum(sizes)
+        marker_chars = len(_build([], [], 0)[len(sys_msgs)]["content"]) - 1
+        k = 0
+        while len(rest) - k > MIN_TAIL:
+            chars = fixed + marker_chars + len(str(dropped + 1)) + remaining
+            if chars // 3 <= limit():
+                return _build(rest[k:], [], dropped + 1), dropped + 1, original, chars // 3
+            remaining -= sizes[k]
+            k += 1
+            dropped += 1
+        candidate = _build(rest[k:], [], dropped)
+        return candidate, dropped, original, _estimate(candidate)
+
     # Phase 1: drop oldest head messages until fit.
     while head:
+        if estimating():
+            return drop_estimated(head + tail, dropped)
         candidate = _build(head, tail, dropped + 1)
-        if _count(candidate, model) <= budget:
-            return candidate, dropped + 1, original, _count(candidate, model)
+        tokens = count(candidate)
+        if tokens <= limit():
+            return candidate, dropped + 1, original, tokens
         head.pop(0)
         dropped += 1
 
@@ -154,20 +334,29 @@ def _trim(messages: list[dict], model: str, target: int) -> tuple[list[dict], in
     # while keeping at least MIN_TAIL messages so the current user turn
     # and one prior turn always survive.
     while len(tail) > MIN_TAIL:
+        if estimating():
+            return drop_estimated(tail, dropped)
         candidate = _build([], tail, dropped + 1)
-        if _count(candidate, model) <= budget:
-            return candidate, dropped + 1, original, _count(candidate, model)
+        tokens = count(candidate)
+        if tokens <= limit():
+            return candidate, dropped + 1, original, tokens
         tail.pop(0)
         dropped += 1
 
     # Phase 3: at MIN_TAIL — final attempt, then give up to fallback.
     candidate = _build([], tail, dropped)
-    return candidate, dropped, original, _count(candidate, model)
+    return candidate, dropped, original, count(candidate)
 
 
 class TrimHandler(CustomLogger):
     """LiteLLM proxy hook that trims oversize prompts before dispatch."""
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # Created when the proxy loads its callbacks, i.e. at startup.
+        if not DISABLED and PREWARM:
+            _schedule_warm(_config_models(CONFIG_PATH))
+
     async def async_pre_call_hook(
         self,
         user_api_key_dict: Any,
@@ -215,9 +404,13 @@ class TrimHandler(CustomLogger):
         else:
             messages_for_count = messages
 
+        # With the breaker open the deadline starts out expired: estimator only.
+        breaker_open = _BREAKER.is_open()
+        deadline = _Deadline(BUDGET_S, expired=breaker_open)
+        started = time.monotonic()
         try:
             new_for_count, dropped, before, after = _trim(
-                messages_for_count, model, TARGET_TOKENS
+                messages_for_count, model, TARGET_TOKENS, deadline
             )
             # _trim may insert its own [trimmed] marker as a system message;
             # we need to strip the synthetic system at index 0 and rewrite
@@ -261,6 +454,12 @@ class TrimHandler(CustomLogger):
             })
             return data
 
+        # A final count may itself have run past the deadline; check once more.
+        over_budget = not breaker_open and not deadline.exact()
+        if not breaker_open:
+            _BREAKER.record(over_budget)
+        elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+
         if dropped > 0:
             data["messages"] = new_messages_final
             _log({
@@ -272,6 +471,8 @@ class TrimHandler(CustomLogger):
                 "messages_in": len(messages),
                 "messages_out": len(new_messages_final),
                 "target": TARGET_TOKENS,
+                "elapsed_ms": elapsed_ms,
+                "estimated": deadline.expired,
             })
         elif before > TARGET_TOKENS - SAFETY_MARGIN:
             # Couldn't drop anything (system+tail alone exceeds budget).
@@ -283,6 +484,9 @@ class TrimHandler(CustomLogger):
                 "messages": len(messages),
                 "note": "single message or system+tail exceeds budget; relying on context_window_fallbacks",
             })
+        if over_budget and not dropped:
+            _log({"event": "over_budget", "model": model, "elapsed_ms": elapsed_ms,
+                  "messages": len(messages)})
 
         return data
 